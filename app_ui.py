@@ -19,10 +19,10 @@ sys.path.append(str(Path(__file__).resolve().parent / "src"))
 
 # --- App imports ---
 from src.side_character_app.app.state import initialize_state, ARCHETYPES
-from src.side_character_app.app.agents import create_all_agents
+from src.side_character_app.app.agents import create_all_agents, retrieval_settings_from_env, open_vector_client
 from src.side_character_app.app.graph import create_graph
+from src.side_character_app.vector_stores.embedding_cache import CachedEmbeddings
 
-from pymilvus import MilvusClient
 from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 
 # --- Avatar mapping ---
@@ -46,20 +46,23 @@ def get_app():
         st.stop()
 
     root = Path(__file__).resolve().parent
-    db_path = root / "data" / "vector_stores" / "milvus_side_characters.db"
+    vector_store_dir = root / "data" / "vector_stores"
     
     try:
-        client = MilvusClient(str(db_path))          # or remote config
+        client = open_vector_client(str(vector_store_dir))          # or remote config
     except Exception as e:
-        st.error(f"❌ Milvus initialisation failed: {e}")
+        st.error(f"❌ Vector store initialisation failed: {e}")
         st.stop()
 
 
     # client = MilvusClient(str(db_path))
 
-    embeddings = GoogleGenerativeAIEmbeddings(
-        model="models/text-embedding-004",
-        google_api_key=api_key
+    embeddings = CachedEmbeddings(
+        GoogleGenerativeAIEmbeddings(
+            model="models/text-embedding-004",
+            google_api_key=api_key
+        ),
+        str(root / "data" / "cache" / "embeddings")
     )
     llm = ChatGoogleGenerativeAI(
         model="gemini-2.0-flash",
@@ -67,7 +70,7 @@ def get_app():
         temperature=0.7
     )
 
-    agents = create_all_agents(llm, client, embeddings)
+    agents = create_all_agents(llm, client, embeddings, **retrieval_settings_from_env())
     return create_graph(llm, agents)
 
 app = get_app()
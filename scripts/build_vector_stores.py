@@ -2,6 +2,9 @@
 
 import os
 import sys
+import time
+import json
+import argparse
 from pathlib import Path
 from dotenv import load_dotenv
 from pymilvus import MilvusClient
@@ -10,10 +13,53 @@ from langchain_google_genai import GoogleGenerativeAIEmbeddings
 # Add the src directory to the Python path
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-from src.side_character_app.vector_stores.builder import build_persona_vector_db   
+from src.side_character_app.vector_stores.builder import build_all_persona_vector_dbs, build_partitioned_persona_db
+from src.side_character_app.vector_stores.partitions import PARTITIONED_COLLECTION
+from src.side_character_app.vector_stores.embedding_cache import CachedEmbeddings
+from src.side_character_app.vector_stores.chunking import ChunkConfig
+from src.side_character_app.vector_stores.index_config import IndexConfig, INDEX_TYPES, METRIC_TYPES, PRECISIONS
+
+def parse_args():
+    """Parses command-line options for the vector store build."""
+    parser = argparse.ArgumentParser(description="Build the persona vector stores from the labeled conversations.")
+    parser.add_argument("--layout", type=str, choices=["collections", "partitioned"], default="collections",
+                        help="'collections': one collection per archetype with conversations of confidence >= 8. "
+                             f"'partitioned': a single '{PARTITIONED_COLLECTION}' collection with one partition per "
+                             "archetype and every conversation, filtered by confidence and genre at query time.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Update existing collections in place: embed only new or changed conversations "
+                             "and delete removed ones instead of rebuilding from scratch.")
+    parser.add_argument("--batch-size", type=int, default=100,
+                        help="Conversations per embedding request and insert.")
+    parser.add_argument("--max-in-flight", type=int, default=4,
+                        help="Embedding requests running concurrently.")
+    parser.add_argument("--no-embedding-cache", action="store_true",
+                        help="Embed every conversation through the API instead of reusing data/cache/embeddings.")
+    parser.add_argument("--embedding-cache-max-entries", type=int, default=1_000_000,
+                        help="Maximum number of cached embeddings before least recently used ones are evicted.")
+    parser.add_argument("--index-type", type=str, choices=INDEX_TYPES, default=None,
+                        help="Vector index for new collections (default: Milvus' default index). "
+                             "IVF_SQ8 stores int8-quantized vectors and IVF_PQ product-quantized codes.")
+    parser.add_argument("--metric-type", type=str, choices=METRIC_TYPES, default="COSINE",
+                        help="Similarity metric of the vector index (with --index-type).")
+    parser.add_argument("--index-params", type=json.loads, default={},
+                        help='Index build parameters as JSON, e.g. \'{"nlist": 256}\' or \'{"M": 32, "efConstruction": 300}\'.')
+    parser.add_argument("--precision", type=str, choices=PRECISIONS, default="float32",
+                        help="Precision vectors are stored at (float16 halves their memory).")
+    parser.add_argument("--truncate-dim", type=int, default=None,
+                        help="Store only the first N dimensions of each (re-normalized) embedding.")
+    parser.add_argument("--chunk-turns", type=int, default=None,
+                        help="Index windows of N turns pointing to their conversation instead of whole conversations.")
+    parser.add_argument("--chunk-overlap", type=int, default=1,
+                        help="Turns shared by consecutive windows (with --chunk-turns).")
+    parser.add_argument("--context-turns", type=int, default=1,
+                        help="Turns around a window returned with it as context (with --chunk-turns).")
+    return parser.parse_args()
 
 def main():
     """Main function to build all persona vector stores."""
+    args = parse_args()
+
     # --- 1. Setup and Initialization ---
     load_dotenv()
     google_api_key = os.getenv("GEMINI_API_KEY")
@@ -23,8 +69,14 @@ def main():
     # --- 2. Define Paths ---
     project_root = Path(__file__).resolve().parents[1]
     input_file = project_root / "data" / "processed" / "side_character_labeled_conversations.json"
+    # The JSONL export has the same rows and can be streamed instead of loaded whole
+    input_jsonl = input_file.with_suffix(".jsonl")
+    if input_jsonl.exists():
+        input_file = input_jsonl
     db_dir = project_root / "data" / "vector_stores"
     db_path = db_dir / "milvus_side_characters.db"
+    checkpoint_path = db_dir / "build_checkpoint.json"
+    embedding_cache_dir = project_root / "data" / "cache" / "embeddings"
 
     # Create directory for the database if it doesn't exist
     db_dir.mkdir(exist_ok=True)
@@ -38,6 +90,8 @@ def main():
         model="models/text-embedding-004",
         google_api_key=google_api_key
     )
+    if not args.no_embedding_cache:
+        embedding_fn = CachedEmbeddings(embedding_fn, str(embedding_cache_dir), max_entries=args.embedding_cache_max_entries)
 
     # --- 4. Configuration (Generic Personas) ---
     # Using archetypes instead of character names
@@ -48,19 +102,60 @@ def main():
         "Loyal Sidekick": {"collection_name": "loyal_sidekick_db"}
     }
     MIN_CONFIDENCE = 8 # Set your desired confidence threshold
+    index_config = None
+    if args.index_type or args.precision != "float32" or args.truncate_dim:
+        index_config = IndexConfig(args.index_type or "FLAT", args.metric_type, args.index_params,
+                                   precision=args.precision, truncate_dim=args.truncate_dim)
+    chunk_config = None
+    if args.chunk_turns:
+        chunk_config = ChunkConfig(args.chunk_turns, args.chunk_overlap, args.context_turns)
 
-    # --- 5. Execution Loop ---
-    print("\nStarting vector database build process...")
-    for label, config in PERSONA_CONFIG.items():
-        print(f"\n--- Building database for: {label} ---")
-        build_persona_vector_db(
+    # --- 5. Single-Pass Build of All Collections ---
+    print("\nStarting vector database build process (one pass over the labeled data)...")
+    start = time.perf_counter()
+    if args.layout == "partitioned":
+        # Every confidence is stored; retrieval filters on it instead of MIN_CONFIDENCE
+        build_stats = build_partitioned_persona_db(
+            client=client,
+            embedding_fn=embedding_fn,
+            json_path=str(input_file),
+            labels=list(PERSONA_CONFIG),
+            incremental=args.incremental,
+            batch_size=args.batch_size,
+            max_in_flight=args.max_in_flight,
+            checkpoint_path=str(checkpoint_path),
+            index_config=index_config,
+            chunk_config=chunk_config
+        )
+    else:
+        build_stats = build_all_persona_vector_dbs(
             client=client,
             embedding_fn=embedding_fn,
             json_path=str(input_file),
-            collection_name=config["collection_name"],
-            label=label,
-            min_confidence=MIN_CONFIDENCE
+            collections={label: config["collection_name"] for label, config in PERSONA_CONFIG.items()},
+            min_confidence=MIN_CONFIDENCE,
+            incremental=args.incremental,
+            batch_size=args.batch_size,
+            max_in_flight=args.max_in_flight,
+            checkpoint_path=str(checkpoint_path),
+            index_config=index_config,
+            chunk_config=chunk_config
         )
+    elapsed = time.perf_counter() - start
+
+    print(f"\n--- Build Summary ({elapsed:.1f}s total) ---")
+    for collection_name, stats in build_stats.items():
+        sync = (f", {stats['added']} added / {stats['removed']} removed / {stats['unchanged']} unchanged"
+                if "added" in stats else "")
+        print(f"  {collection_name}: {stats['rows']} rows, {stats['written']} written{sync}; "
+              f"embedding {stats['embed_seconds']:.1f}s, writing {stats['write_seconds']:.1f}s")
+
+    if isinstance(embedding_fn, CachedEmbeddings):
+        cache_stats = embedding_fn.stats()
+        print(f"\nEmbedding cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['hit_rate']:.0%} hit rate), {cache_stats['evictions']} evicted, "
+              f"{cache_stats['entries']} entries stored.")
+        embedding_fn.close()
 
     print("\n✅ All persona vector databases have been successfully created.")
 
@@ -0,0 +1,46 @@
+# scripts/export_numpy_store.py
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from pymilvus import MilvusClient
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.side_character_app.vector_stores.numpy_store import export_collection
+
+def parse_args():
+    """Parses command-line options for the export."""
+    parser = argparse.ArgumentParser(description="Export the persona collections to memory-mapped NumPy files "
+                                                 "for the in-process retriever backend.")
+    parser.add_argument("--collections", type=str, nargs="+",
+                        default=["wise_mentor_db", "comedic_relief_db", "skeptical_realist_db", "loyal_sidekick_db"],
+                        help="Collections to export.")
+    return parser.parse_args()
+
+def main():
+    """Exports each collection of the Milvus database to data/vector_stores/numpy/."""
+    args = parse_args()
+
+    # --- 1. Define Paths ---
+    project_root = Path(__file__).resolve().parents[1]
+    db_path = project_root / "data" / "vector_stores" / "milvus_side_characters.db"
+    output_dir = project_root / "data" / "vector_stores" / "numpy"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # --- 2. Export ---
+    client = MilvusClient(str(db_path))
+    for collection_name in args.collections:
+        if not client.has_collection(collection_name=collection_name):
+            print(f"Collection '{collection_name}' not found. Skipping.")
+            continue
+        start = time.perf_counter()
+        rows = export_collection(client, collection_name, str(output_dir))
+        print(f"Exported {rows} entries from '{collection_name}' in {time.perf_counter() - start:.1f}s.")
+
+    print(f"\n✅ NumPy vector store written to: {output_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# scripts/report_classification_metrics.py
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.side_character_app.classification.telemetry import load_events, summarize, format_report
+
+def parse_args():
+    """Parses command-line options for the metrics report."""
+    project_root = Path(__file__).resolve().parents[1]
+    parser = argparse.ArgumentParser(description="Summarize the structured metrics written by run_classification.py.")
+    parser.add_argument("--metrics", type=str, default=str(project_root / "logs" / "classification_metrics.jsonl"),
+                        help="Path of the metrics JSONL file.")
+    parser.add_argument("--session", type=str, default=None,
+                        help="Report on this session id instead of the most recent one.")
+    parser.add_argument("--all", action="store_true", help="Aggregate over every session in the file.")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON.")
+    return parser.parse_args()
+
+def main():
+    """Prints throughput, latency percentiles and rate-limiting cost for a classification run."""
+    args = parse_args()
+    if not Path(args.metrics).exists():
+        print(f"Metrics file not found: {args.metrics}")
+        return
+
+    events = load_events(args.metrics, session=args.session, all_sessions=args.all)
+    if not events:
+        print("No matching sessions found.")
+        return
+
+    summary = summarize(events)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(format_report(summary))
+
+if __name__ == "__main__":
+    main()
@@ -10,11 +10,12 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 # --- Imports from our app modules ---
 from src.side_character_app.app.state import initialize_state, ARCHETYPES
-from src.side_character_app.app.agents import create_all_agents
+from src.side_character_app.app.agents import create_all_agents, retrieval_settings_from_env, open_vector_client
 from src.side_character_app.app.graph import create_graph
+from src.side_character_app.app.tools import query_cache_stats
+from src.side_character_app.vector_stores.embedding_cache import CachedEmbeddings
 
 # --- Imports from libraries ---
-from pymilvus import MilvusClient
 from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 
 def main():
@@ -27,17 +28,21 @@ def main():
 
     # --- 2. Define Paths ---
     project_root = Path(__file__).resolve().parents[1]
-    db_path = project_root / "data" / "vector_stores" / "milvus_side_characters.db"
+    vector_store_dir = project_root / "data" / "vector_stores"
     
     # --- 3. Initialize Clients ---
     print("Initializing clients...")
-    client = MilvusClient(str(db_path))
-    embedding_fn = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004", google_api_key=google_api_key)
+    # Milvus Lite, or the NumPy export with PERSONA_VECTOR_BACKEND=numpy
+    client = open_vector_client(str(vector_store_dir))
+    embedding_fn = CachedEmbeddings(
+        GoogleGenerativeAIEmbeddings(model="models/text-embedding-004", google_api_key=google_api_key),
+        str(project_root / "data" / "cache" / "embeddings")
+    )
     llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", google_api_key=google_api_key, temperature=0.7)
 
     # --- 4. Build Core App Components ---
     print("Creating agents and compiling graph...")
-    agents = create_all_agents(llm, client, embedding_fn)
+    agents = create_all_agents(llm, client, embedding_fn, **retrieval_settings_from_env())
     app = create_graph(llm, agents)
     print("✅ Application is compiled and ready!")
 
@@ -77,6 +82,9 @@ def main():
             
         conversation_state = final_state
 
+    cache_stats = query_cache_stats()
+    print(f"\nQuery embedding cache: {cache_stats['hits']} hits, {cache_stats['coalesced']} coalesced, "
+          f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate).")
     print("\nThank you for chatting!")
 
 if __name__ == "__main__":
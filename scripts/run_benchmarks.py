@@ -0,0 +1,74 @@
+# scripts/run_benchmarks.py
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.side_character_app.benchmarks.synthetic import generate_corpus
+from src.side_character_app.benchmarks.preprocessing import run_preprocessing_benchmark, environment_info, compare_results
+
+def parse_args():
+    """Parses command-line options for the benchmark suite."""
+    parser = argparse.ArgumentParser(description="Benchmark the preprocessing pipeline on synthetic corpora.")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1],
+                        help="Corpus sizes relative to Cornell, e.g. --scales 1 10 100.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic corpus generator.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Also benchmark the sharded build with this many processes (if > 1).")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the tracemalloc runs and only record wall time.")
+    parser.add_argument("--compare", type=str, default=None,
+                        help="Path of a previous results JSON to compare stage timings against.")
+    return parser.parse_args()
+
+def main():
+    """Generates synthetic corpora (once per scale/seed) and records timed runs of each stage."""
+    args = parse_args()
+
+    # --- 1. Define Paths ---
+    project_root = Path(__file__).resolve().parents[1]
+    bench_dir = project_root / "data" / "benchmarks"
+    bench_dir.mkdir(parents=True, exist_ok=True)
+
+    # --- 2. Run each scale ---
+    report = {**environment_info(str(project_root)), "seed": args.seed, "workers": args.workers, "runs": {}}
+    for scale in args.scales:
+        scale_key = f"{scale:g}x"
+        corpus_dir = bench_dir / f"corpus_{scale_key}_seed{args.seed}"
+        if not (corpus_dir / "movie_conversations.tsv").exists():
+            print(f"Generating {scale_key} synthetic corpus in {corpus_dir}...")
+            generate_corpus(str(corpus_dir), scale=scale, seed=args.seed)
+
+        print(f"\n--- Benchmarking {scale_key} corpus ---")
+        report["runs"][scale_key] = run_preprocessing_benchmark(str(corpus_dir), workers=args.workers,
+                                                                track_memory=not args.no_memory)
+
+    # --- 3. Save and summarize ---
+    output_path = bench_dir / f"preprocessing_{report['git_commit']}_{report['timestamp'].replace(':', '')}.json"
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print("\n--- Benchmark Summary ---")
+    for scale_key, run in report["runs"].items():
+        print(f"{scale_key}: {run['corpus']['lines']} lines, {run['corpus']['conversations']} conversations, "
+              f"{run['personas']} personas")
+        for stage, metrics in run["stages"].items():
+            memory = f", peak {metrics['peak_mb']} MB" if "peak_mb" in metrics else ""
+            print(f"  {stage}: {metrics['seconds']:.3f}s{memory}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\n--- Comparison with {os.path.basename(args.compare)} ({baseline.get('git_commit')}) ---")
+        for scale_key, stage, before, after, ratio in compare_results(report, baseline):
+            print(f"  {scale_key} {stage}: {before:.3f}s -> {after:.3f}s ({ratio:.2f}x)")
+
+    print(f"\nResults saved to: {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,7 @@ import os
 import json
 import sys
 import logging
-import time
-from collections import defaultdict
+import argparse
 from pathlib import Path
 from tqdm import tqdm
 
@@ -13,150 +12,248 @@ from tqdm import tqdm
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 # --- Imports from our app modules ---
-from src.side_character_app.classification.classifier import classify_character
+from src.side_character_app.classification.cache import ClassificationCache
+from src.side_character_app.classification.engine import ClassificationEngine
+from src.side_character_app.classification.store import ClassificationStore
+from src.side_character_app.classification.classifier import select_conversations, build_prompt, estimate_tokens
+from src.side_character_app.classification.fake_client import FakeGenaiClient
+from src.side_character_app.classification.local_model import LocalCascade, training_examples
 from src.side_character_app.classification.schemas import SideCharacterClassification
+from src.side_character_app.classification.telemetry import TelemetryWriter
+from src.side_character_app.data_processing.streaming import iter_personas_jsonl
 
 # --- Imports from libraries ---
 from dotenv import load_dotenv
 from google import genai
 
+def parse_args():
+    """Parses command-line options for the classification pipeline."""
+    parser = argparse.ArgumentParser(description="Classify side characters into archetypes with Gemini.")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="Read personas lazily from side_character_personas.jsonl instead of the JSON file.")
+    parser.add_argument("--follow", action="store_true",
+                        help="With --jsonl, keep consuming personas while run_preprocessing.py is still writing them.")
+    parser.add_argument("--max-in-flight", type=int, default=4,
+                        help="Maximum number of classification requests running concurrently.")
+    parser.add_argument("--rpm", type=float, default=30,
+                        help="Requests-per-minute budget enforced by a token bucket (0 disables the limit).")
+    parser.add_argument("--max-retries", type=int, default=5,
+                        help="Attempts per character before giving up on rate-limit errors.")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Pack up to this many small characters into one classification request (1 disables batching).")
+    parser.add_argument("--batch-max-chars", type=int, default=2000,
+                        help="Only characters whose dialogue is at most this many characters long are batched.")
+    parser.add_argument("--token-budget", type=int, default=None,
+                        help="Maximum estimated dialogue tokens per character prompt; a representative subset "
+                             "of conversations is used when a character exceeds it.")
+    parser.add_argument("--no-result-cache", action="store_true",
+                        help="Do not consult or fill the persistent classification result cache.")
+    parser.add_argument("--cache-max-entries", type=int, default=100_000,
+                        help="Maximum number of cached classification responses before LRU eviction.")
+    parser.add_argument("--cascade", action="store_true",
+                        help="Label clear-cut characters with a local model trained on the already-labeled results "
+                             "and only send ambiguous ones to the API.")
+    parser.add_argument("--cascade-threshold", type=float, default=0.5,
+                        help="Minimum probability margin between the local model's top two labels to accept its answer.")
+    parser.add_argument("--cascade-min-examples", type=int, default=200,
+                        help="Minimum number of API-labeled characters needed before the local model is used.")
+    parser.add_argument("--no-metrics", action="store_true",
+                        help="Do not write structured per-character events to logs/classification_metrics.jsonl.")
+    parser.add_argument("--skip-export", action="store_true",
+                        help="Do not export the results store to JSON/JSONL at the end of the run.")
+    parser.add_argument("--fake-client", action="store_true",
+                        help="Use a local fake client that simulates latency and 429s instead of the Gemini API.")
+    return parser.parse_args()
+
 def main():
     """Main function to run the classification pipeline with robust resume and retry logic."""
+    args = parse_args()
+
     # --- 1. Setup ---
     load_dotenv()
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY not found in environment variables.")
-    
-    client = genai.Client(api_key=api_key)
+    if args.fake_client:
+        client = FakeGenaiClient()
+    else:
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not found in environment variables.")
+        client = genai.Client(api_key=api_key)
 
     # --- 2. Define Paths ---
     project_root = Path(__file__).resolve().parents[1]
     input_file = project_root / "data" / "processed" / "side_character_personas.json"
+    input_jsonl = project_root / "data" / "processed" / "side_character_personas.jsonl"
     output_dir = project_root / "data" / "processed"
     log_dir = project_root / "logs"
 
+    store_file = output_dir / "side_character_labeled_conversations.sqlite"
     output_jsonl = output_dir / "side_character_labeled_conversations.jsonl"
     final_json = output_dir / "side_character_labeled_conversations.json"
     log_file = log_dir / "classification_log.txt"
+    metrics_file = log_dir / "classification_metrics.jsonl"
+    cache_dir = project_root / "data" / "cache"
+    cache_file = cache_dir / "classification_cache.sqlite"
 
     output_dir.mkdir(exist_ok=True)
     log_dir.mkdir(exist_ok=True)
+    cache_dir.mkdir(parents=True, exist_ok=True)
     
     # --- 3. Setup Logger ---
     logging.basicConfig(filename=log_file, level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
     logging.info("----- Started new classification session -----")
 
-    # --- 4. Initialize Summary Stats and Resume Logic ---
-    print("Initializing stats and checking for existing data to resume...")
-    character_label_counts = defaultdict(int)
-    conversation_label_counts = defaultdict(int)
-    confidence_buckets = defaultdict(int) # **FIX**: Added back
-    existing_ids = set()
-    _counted_characters_from_file = set()
-
-    if output_jsonl.exists():
-        with open(output_jsonl, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    data = json.loads(line)
-                    key = (data["character_name"], data["movie_title"])
-                    existing_ids.add(key)
-                    
-                    # Populate stats from the existing file.
-                    label = data["label"]
-                    confidence = data.get("confidence")
-                    conversation_label_counts[label] += 1
-                    
-                    if key not in _counted_characters_from_file:
-                        character_label_counts[label] += 1
-                        # **FIX**: Populate confidence buckets from resumed data
-                        if isinstance(confidence, (int, float)):
-                            for threshold in range(5, 11):
-                                if confidence >= threshold:
-                                    confidence_buckets[f"{threshold-1}+"] += 1
-                        _counted_characters_from_file.add(key)
-
-                except (json.JSONDecodeError, KeyError):
-                    logging.warning(f"Skipping malformed line during resume scan: {line.strip()}")
+    # --- 4. Open the Results Store (Resume Logic) ---
+    print("Opening the classification results store...")
+    store = ClassificationStore(str(store_file))
+    if len(store) == 0 and output_jsonl.exists():
+        # One-time migration of results written by earlier versions of this script
+        imported = store.import_jsonl(str(output_jsonl))
+        logging.info(f"Imported {imported} characters from {output_jsonl.name} into the results store.")
     
-    print(f"Resuming. Found {len(existing_ids)} characters already processed.")
+    print(f"Resuming. Found {len(store)} characters already processed.")
 
     # --- 5. Load Source Data ---
-    with open(input_file, "r", encoding="utf-8") as f:
-        character_entries = json.load(f)
-
-    # --- 6. Main Classification Loop with Correct Retry Logic ---
-    with open(output_jsonl, "a", encoding="utf-8") as f_out:
-        for entry in tqdm(character_entries, desc="Classifying Characters"):
-            entry_id = (entry["side_character_name"], entry["movie_title"])
-            if entry_id in existing_ids:
-                continue
-            
-            max_retries = 5
-            retries = max_retries
-            result = None
-
-            while retries > 0:
-                try:
-                    result = classify_character(client, entry)
-                    break # Success! Exit the retry loop.
-                except Exception as e:
-                    # **THE FIX**: Check the error message text for rate limit indicators.
-                    error_text = str(e).upper()
-                    if "429" in error_text and ("RESOURCE_EXHAUSTED" in error_text or "TOO MANY REQUESTS" in error_text):
-                        retries -= 1
-                        wait_time = 60 # Wait 60 seconds
-                        logging.warning(f"RATE LIMIT HIT for {entry_id}. Retries left: {retries}. Waiting for {wait_time}s.")
-                        if retries > 0:
-                            time.sleep(wait_time)
-                        else:
-                            logging.error(f"MAX RETRIES FAILED for {entry_id} due to rate limiting. Skipping character.")
-                    else:
-                        # This is a different, truly non-recoverable error
-                        logging.error(f"NON-RECOVERABLE ERROR for {entry_id}: {e}")
-                        break # Exit retry loop for non-rate-limit errors
-            
-            if result is None:
-                continue
-
-            # --- Process successful result ---
-            for conv_id, conv_text in entry["conversations"].items():
-                output_entry = {
-                    "character_name": entry["side_character_name"], "movie_title": entry["movie_title"],
-                    "genre": entry.get("genre", []), "conversation_id": conv_id, "conversation": conv_text,
-                    "label": result.label, "confidence": result.confidence
-                }
-                f_out.write(json.dumps(output_entry) + "\n")
-            
-            # Update stats for the newly processed character
-            character_label_counts[result.label] += 1
-            conversation_label_counts[result.label] += len(entry["conversations"])
-            # **FIX**: Update confidence buckets for new data
-            for threshold in range(5, 11):
-                if result.confidence >= threshold:
-                    confidence_buckets[f"{threshold}+"] += 1
-            
-            logging.info(f"SUCCESS: {entry_id} -> {result.label} (Confidence: {result.confidence})")
-
-    # --- 7. Final Conversion and Summary ---
-    print("\nClassification loop complete. Converting final JSONL to JSON...")
-    data = [json.loads(line) for line in open(output_jsonl, "r", encoding="utf-8")]
-    with open(final_json, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-    print(f"Conversion complete. Wrote {len(data)} conversations to {final_json.name}.")
+    if args.jsonl:
+        # Streamed one persona at a time; never materialized as a list
+        character_entries = iter_personas_jsonl(str(input_jsonl), follow=args.follow)
+    else:
+        with open(input_file, "r", encoding="utf-8") as f:
+            character_entries = json.load(f)
+
+    # --- 6. Train the Local Pre-Classifier (Optional Cascade) ---
+    cascade = None
+    if args.cascade:
+        texts, labels = training_examples(store)
+        if len(texts) < args.cascade_min_examples or len(set(labels)) < 2:
+            print(f"Cascade disabled: only {len(texts)} API-labeled characters available "
+                  f"(need {args.cascade_min_examples} covering at least two labels).")
+        else:
+            print(f"Training the local pre-classifier on {len(texts)} API-labeled characters...")
+            cascade, cascade_report = LocalCascade.train(texts, labels, args.cascade_threshold)
+            print("Held-out estimate (API labels as reference):")
+            for row in cascade_report:
+                marker = " <- selected" if row["threshold"] == args.cascade_threshold else ""
+                print(f"  margin >= {row['threshold']:.2f}: labels {row['coverage']:.0%} locally, "
+                      f"{row['agreement']:.0%} agreement, accuracy change {row['accuracy_change']:+.1%}{marker}")
+            logging.info(f"Cascade threshold report: {cascade_report}")
+
+    # --- 7. Concurrent Classification Loop (results are written in input order) ---
+    result_cache = None if args.no_result_cache else ClassificationCache(str(cache_file), max_entries=args.cache_max_entries)
+    engine = ClassificationEngine(
+        client,
+        max_in_flight=args.max_in_flight,
+        requests_per_minute=args.rpm or None,
+        max_retries=args.max_retries,
+        batch_size=args.batch_size,
+        max_batch_dialog_chars=args.batch_max_chars,
+        cache=result_cache,
+        classify_kwargs={"token_budget": args.token_budget} if args.token_budget else None,
+        cascade=cascade,
+    )
+    telemetry = None if args.no_metrics else TelemetryWriter(str(metrics_file), {
+        "max_in_flight": args.max_in_flight, "rpm": args.rpm, "max_retries": args.max_retries,
+        "batch_size": args.batch_size, "token_budget": args.token_budget,
+        "result_cache": not args.no_result_cache, "cascade": cascade is not None,
+        "fake_client": args.fake_client,
+    })
+    prompt_tokens_total = prompt_tokens_used = 0
+    classified_locally = classified_by_api = 0
+    pending_entries = (
+        entry for entry in character_entries
+        if (entry["side_character_name"], entry["movie_title"]) not in store
+    )
+    for outcome in tqdm(engine.run(pending_entries), desc="Classifying Characters"):
+        entry = outcome.entry
+        entry_id = (entry["side_character_name"], entry["movie_title"])
+        result = outcome.result
+
+        if telemetry:
+            prompt = "" if outcome.source == "local" else build_prompt(entry, args.token_budget)
+            telemetry.record(outcome, len(prompt), estimate_tokens(prompt))
+        if outcome.rate_limited:
+            logging.warning(f"RATE LIMIT HIT {outcome.rate_limited} time(s) for {entry_id}. "
+                            f"Waited {outcome.wait_seconds:.1f}s in total.")
+        if result is None:
+            if outcome.rate_limited and outcome.attempts >= args.max_retries:
+                logging.error(f"MAX RETRIES FAILED for {entry_id} due to rate limiting. Skipping character.")
+            else:
+                logging.error(f"NON-RECOVERABLE ERROR for {entry_id}: {outcome.error}")
+            continue
+
+        # --- Process successful result ---
+        if outcome.source == "local":
+            classified_locally += 1
+            used_conversations = set()
+        else:
+            classified_by_api += 1
+            # Record which conversations the prompt was built from so results stay reproducible
+            selection = select_conversations(entry, args.token_budget)
+            prompt_tokens_total += selection["total_tokens"]
+            prompt_tokens_used += selection["used_tokens"]
+            used_conversations = set(selection["used"])
+        output_rows = []
+        for conv_id, conv_text in entry["conversations"].items():
+            output_entry = {
+                "character_name": entry["side_character_name"], "movie_title": entry["movie_title"],
+                "genre": entry.get("genre", []), "conversation_id": conv_id, "conversation": conv_text,
+                "label": result.label, "confidence": result.confidence
+            }
+            if args.token_budget:
+                output_entry["in_prompt"] = conv_id in used_conversations
+            if cascade:
+                output_entry["classified_by"] = outcome.source
+            output_rows.append(output_entry)
+        # Committed per character, so an interrupted run resumes from the last stored one
+        store.add_character(entry["side_character_name"], entry["movie_title"], output_rows)
+        
+        source = " [local]" if outcome.source == "local" else " [cached]" if outcome.cached else ""
+        logging.info(f"SUCCESS: {entry_id} -> {result.label} (Confidence: {result.confidence}){source}")
+
+    if args.token_budget:
+        print(f"\nPrompt token budget {args.token_budget}: used ~{prompt_tokens_used} of ~{prompt_tokens_total} "
+              f"dialogue tokens (saved ~{prompt_tokens_total - prompt_tokens_used}).")
+        logging.info(f"Prompt tokens used: {prompt_tokens_used} / {prompt_tokens_total}")
+
+    if telemetry:
+        telemetry.close()
+        print(f"\nPer-character metrics appended to {metrics_file.name}; "
+              f"summarize them with scripts/report_classification_metrics.py.")
+
+    if cascade:
+        total = classified_locally + classified_by_api
+        print(f"\nLocal cascade: labeled {classified_locally} of {total} characters locally "
+              f"({classified_locally / total if total else 0:.0%}); {classified_by_api} were sent to the API.")
+        logging.info(f"Cascade: {classified_locally} local, {classified_by_api} via API")
+
+    if result_cache:
+        cache_stats = result_cache.stats()
+        result_cache.close()
+        print(f"\nResult cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['hit_rate']:.0%} hit rate), {cache_stats['evictions']} evicted, "
+              f"{cache_stats['entries']} entries stored.")
+        logging.info(f"Result cache stats: {cache_stats}")
+
+    # --- 8. Final Export and Summary ---
+    if not args.skip_export:
+        print("\nClassification loop complete. Exporting the results store to JSONL and JSON...")
+        store.export_jsonl(str(output_jsonl))
+        row_count = store.export_json(str(final_json))
+        print(f"Export complete. Wrote {row_count} conversations to {output_jsonl.name} and {final_json.name}.")
 
     # **FIX**: Print all three summary sections correctly
+    summary = store.summary()
+    store.close()
     print("\n--- Final Dataset Summary (Total) ---")
     print("Characters per label:")
-    for label, count in sorted(character_label_counts.items()):
+    for label, count in sorted(summary["characters_per_label"].items()):
         print(f"  {label}: {count}")
 
     print("\nConversations per label:")
-    for label, count in sorted(conversation_label_counts.items()):
+    for label, count in sorted(summary["conversations_per_label"].items()):
         print(f"  {label}: {count}")
         
     print("\nConfidence Score Distribution (Characters):")
+    confidence_buckets = summary["confidence_buckets"]
     for k in sorted(confidence_buckets.keys()):
         print(f"  {k}: {confidence_buckets[k]} characters")
 
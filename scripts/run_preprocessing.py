@@ -3,45 +3,105 @@
 import os
 import json
 import sys
+import argparse
 
 # Add the src directory to the Python path to allow for absolute imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from src.side_character_app.data_processing.loader import load_and_clean_data
-from src.side_character_app.data_processing.builder import build_side_character_conversations
+from src.side_character_app.data_processing.cache import load_cached_data
+from src.side_character_app.data_processing.builder import (
+    build_side_character_conversations, iter_side_character_conversations,
+    filter_by_conversation_count, has_valid_conversation_count,
+)
+from src.side_character_app.data_processing.streaming import write_personas_jsonl
+from src.side_character_app.data_processing.incremental import build_incremental
+from src.side_character_app.data_processing.parallel import build_side_character_conversations_parallel
+
+def parse_args():
+    """Parses command-line options for the preprocessing pipeline."""
+    parser = argparse.ArgumentParser(description="Build side-character personas from the raw Cornell corpus.")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Number of lines parsed per chunk from movie_lines.tsv.")
+    parser.add_argument("--memory-budget-mb", type=float, default=None,
+                        help="Memory budget (MB) for one chunk of movie_lines.tsv; used when --chunk-size is not set.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always re-parse the raw files instead of using the cached corpus.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes to shard the build across by movieID (1 = serial).")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only rebuild movies whose raw rows changed since the last incremental run, "
+                             "and write a delta file next to the output.")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="Write side_character_personas.jsonl (one persona per line, streamed as it is built) "
+                             "instead of the indented JSON file.")
+    return parser.parse_args()
 
 def main():
     """Main function to run the data preprocessing pipeline."""
+    args = parse_args()
+
     # --- Define Paths ---
     # Assumes the script is run from the project root directory
     project_root = os.path.dirname(os.path.dirname(__file__))
     raw_data_dir = os.path.join(project_root, "data", "raw")
     processed_data_dir = os.path.join(project_root, "data", "processed")
-    output_path = os.path.join(processed_data_dir, "side_character_personas.json")
+    output_path = os.path.join(processed_data_dir, "side_character_personas.jsonl" if args.jsonl else "side_character_personas.json")
+    state_path = os.path.join(processed_data_dir, "side_character_personas.state.json")
+    delta_path = os.path.join(processed_data_dir, "side_character_personas.delta.json")
+    cache_dir = os.path.join(project_root, "data", "cache")
 
     # Create the processed data directory if it doesn't exist
     os.makedirs(processed_data_dir, exist_ok=True)
 
     # --- Run Pipeline ---
-    # 1. Load data
-    dataframes = load_and_clean_data(raw_data_dir)
-    
-    # 2. Build structured conversations
-    results = build_side_character_conversations(dataframes)
+    # 1. Load data (from the fingerprinted cache unless disabled)
+    if args.no_cache:
+        dataframes = load_and_clean_data(raw_data_dir, chunk_size=args.chunk_size, memory_budget_mb=args.memory_budget_mb)
+    else:
+        os.makedirs(cache_dir, exist_ok=True)
+        dataframes = load_cached_data(raw_data_dir, cache_dir, chunk_size=args.chunk_size, memory_budget_mb=args.memory_budget_mb)
     
-    # 3. Filter results based on conversation count
     MAX_CONVERSATIONS = 50
-    filtered_results = [
-        r for r in results
-        if 1 <= len([c for c in r["conversations"].values() if c.strip()]) <= MAX_CONVERSATIONS
-    ]
-    
-    # 4. Write to JSON
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(filtered_results, f, indent=2, ensure_ascii=False)
-        
+    delta = None
+    if args.incremental:
+        # 2-3. Rebuild and filter only the movies that changed
+        filtered_results, delta = build_incremental(dataframes, state_path, MAX_CONVERSATIONS)
+    elif args.workers > 1:
+        # 2. Build structured conversations
+        results, shard_stats = build_side_character_conversations_parallel(dataframes, args.workers)
+        for stats in shard_stats:
+            print(f"  Shard {stats['shard']}: {stats['movies']} movies, {stats['conversations']} conversations "
+                  f"-> {stats['rows']} rows in {stats['seconds']:.2f}s")
+        # 3. Filter results based on conversation count
+        filtered_results = filter_by_conversation_count(results, MAX_CONVERSATIONS)
+    elif args.jsonl:
+        # 2-3. Build and filter lazily so personas are written as soon as they are ready
+        filtered_results = (
+            entry for entry in iter_side_character_conversations(dataframes)
+            if has_valid_conversation_count(entry, MAX_CONVERSATIONS)
+        )
+    else:
+        # 2. Build structured conversations
+        results = build_side_character_conversations(dataframes)
+        # 3. Filter results based on conversation count
+        filtered_results = filter_by_conversation_count(results, MAX_CONVERSATIONS)
+
+    # 4. Write to JSON (or stream to JSONL)
+    if args.jsonl:
+        persona_count = write_personas_jsonl(filtered_results, output_path)
+    else:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(filtered_results, f, indent=2, ensure_ascii=False)
+        persona_count = len(filtered_results)
+    if delta is not None:
+        with open(delta_path, "w", encoding="utf-8") as f:
+            json.dump(delta, f, indent=2, ensure_ascii=False)
+        print(f"Delta: {len(delta['added'])} added, {len(delta['updated'])} updated, "
+              f"{len(delta['removed'])} removed personas -> {delta_path}")
+
     print(f"\nPreprocessing complete.")
-    print(f"Processed {len(filtered_results)} side character personas.")
+    print(f"Processed {persona_count} side character personas.")
     print(f"Output saved to: {output_path}")
 
 if __name__ == "__main__":
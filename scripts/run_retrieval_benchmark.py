@@ -0,0 +1,83 @@
+# scripts/run_retrieval_benchmark.py
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from pymilvus import MilvusClient
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.side_character_app.benchmarks.retrieval import (run_retrieval_benchmark, DEFAULT_BENCHMARK_CONFIGS,
+                                                        COMPRESSION_BENCHMARK_CONFIGS)
+from src.side_character_app.benchmarks.preprocessing import environment_info
+from src.side_character_app.vector_stores.index_config import IndexConfig, INDEX_TYPES, METRIC_TYPES
+
+def parse_args():
+    """Parses command-line options for the retrieval benchmark."""
+    parser = argparse.ArgumentParser(description="Compare recall@k and query latency of ANN index settings "
+                                                 "on the built persona collections.")
+    parser.add_argument("--collections", type=str, nargs="+",
+                        default=["wise_mentor_db", "comedic_relief_db", "skeptical_realist_db", "loyal_sidekick_db"],
+                        help="Collections whose vectors are benchmarked.")
+    parser.add_argument("--compression", action="store_true",
+                        help="Compare storage formats (float16, truncated dimensions, IVF_SQ8 int8, IVF_PQ) "
+                             "instead of index types: memory saved and recall lost versus float32.")
+    parser.add_argument("--rerank-k", type=int, default=0,
+                        help="Also report recall after re-ranking this many candidates with full-precision vectors.")
+    parser.add_argument("--index-types", type=str, nargs="+", choices=INDEX_TYPES, default=None,
+                        help="Only benchmark the default settings of these index types.")
+    parser.add_argument("--metric-type", type=str, choices=METRIC_TYPES, default=None,
+                        help="Benchmark the settings with this metric instead of COSINE.")
+    parser.add_argument("--k", type=int, default=5, help="Number of results per query (the retriever uses 5).")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per collection.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the query sample.")
+    return parser.parse_args()
+
+def main():
+    """Indexes each collection's vectors with several settings and records recall and latency."""
+    args = parse_args()
+
+    # --- 1. Define Paths ---
+    project_root = Path(__file__).resolve().parents[1]
+    db_path = project_root / "data" / "vector_stores" / "milvus_side_characters.db"
+    bench_dir = project_root / "data" / "benchmarks"
+    bench_dir.mkdir(parents=True, exist_ok=True)
+    bench_db_path = bench_dir / "retrieval_bench.db"
+
+    # --- 2. Select index settings ---
+    configs = [config for config in (COMPRESSION_BENCHMARK_CONFIGS if args.compression else DEFAULT_BENCHMARK_CONFIGS)
+               if not args.index_types or config.index_type in args.index_types]
+    if args.metric_type:
+        configs = [IndexConfig(config.index_type, args.metric_type, config.build_params, config.search_params,
+                               config.precision, config.truncate_dim)
+                   for config in configs]
+
+    # --- 3. Run the benchmark in a scratch database ---
+    client = MilvusClient(str(db_path))
+    bench_client = MilvusClient(str(bench_db_path))
+    report = {**environment_info(str(project_root)), "k": args.k, "seed": args.seed, "rerank_k": args.rerank_k,
+              "collections": run_retrieval_benchmark(client, bench_client, args.collections, configs, k=args.k,
+                                                     n_queries=args.queries, seed=args.seed, rerank_k=args.rerank_k)}
+
+    # --- 4. Save and summarize ---
+    output_path = bench_dir / f"retrieval_{report['git_commit']}_{report['timestamp'].replace(':', '')}.json"
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print("\n--- Retrieval Benchmark Summary ---")
+    for collection_name, run in report["collections"].items():
+        print(f"{collection_name}: {run['entities']} vectors, {run['queries']} queries")
+        for result in run["results"]:
+            latency = result["latency_ms"]
+            reranked = (f" ({result[f'recall_at_{args.k}_reranked']:.3f} re-ranked, "
+                        f"p50 {result['reranked_latency_ms']['p50']:.2f}ms)" if args.rerank_k else "")
+            print(f"  {result['setting']}: recall@{args.k} {result[f'recall_at_{args.k}']:.3f}{reranked}, "
+                  f"p50 {latency['p50']:.2f}ms, p95 {latency['p95']:.2f}ms, build {result['build_seconds']:.2f}s, "
+                  f"vectors {result['vector_memory_mb']:.1f} MB ({result['memory_saved']:.0%} saved)")
+
+    print(f"\nResults saved to: {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@
 
 import os
 import sys
+import json
+import argparse
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -11,16 +13,40 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 # --- Imports from our app modules ---
 # We import the tool function directly to test it
 from src.side_character_app.app.tools import retrieve_persona_examples
+from src.side_character_app.vector_stores.embedding_cache import CachedEmbeddings
+from src.side_character_app.vector_stores.partitions import PARTITIONED_COLLECTION
+from src.side_character_app.vector_stores.numpy_store import NumpyVectorStore
 
 # --- Imports from libraries ---
-from pymilvus import MilvusClient
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
+def parse_args():
+    """Parses command-line options for the retriever test."""
+    parser = argparse.ArgumentParser(description="Run a test query against each persona's vector database.")
+    parser.add_argument("--search-params", type=json.loads, default=None,
+                        help='Milvus search parameters as JSON, e.g. \'{"params": {"ef": 128}}\' for HNSW '
+                             'or \'{"params": {"nprobe": 32}}\' for IVF_FLAT.')
+    parser.add_argument("--backend", type=str, choices=["milvus", "numpy"], default="milvus",
+                        help="Search the Milvus Lite database or its NumPy export (scripts/export_numpy_store.py).")
+    parser.add_argument("--layout", type=str, choices=["collections", "partitioned"], default="collections",
+                        help="Search the per-archetype collections or the partitioned collection.")
+    parser.add_argument("--min-confidence", type=int, default=8,
+                        help="Minimum confidence of retrieved conversations (partitioned layout).")
+    parser.add_argument("--genre", type=str, default=None,
+                        help="Only retrieve conversations from movies of this genre (partitioned layout).")
+    parser.add_argument("--rerank-k", type=int, default=0,
+                        help="Re-rank this many candidates with full-precision vectors (for compressed stores).")
+    parser.add_argument("--chunked", action="store_true",
+                        help="The store holds turn-window chunks (built with --chunk-turns): show matching excerpts.")
+    return parser.parse_args()
+
 def main():
     """
     A standalone script to test and demonstrate the RAG retriever's performance
     for each persona-specific vector database.
     """
+    args = parse_args()
+
     # --- 1. Setup and Initialization ---
     load_dotenv()
     google_api_key = os.getenv("GEMINI_API_KEY")
@@ -29,14 +55,20 @@ def main():
 
     # --- 2. Define Paths ---
     project_root = Path(__file__).resolve().parents[1]
-    db_path = project_root / "data" / "vector_stores" / "milvus_side_characters.db"
+    vector_store_dir = project_root / "data" / "vector_stores"
     
     # --- 3. Initialize Clients ---
     print("Initializing clients...")
-    client = MilvusClient(str(db_path))
-    embedding_fn = GoogleGenerativeAIEmbeddings(
-        model="models/text-embedding-004",
-        google_api_key=google_api_key
+    if args.backend == "numpy":
+        client = NumpyVectorStore(str(vector_store_dir / "numpy"))
+    else:
+        # Imported here so the NumPy backend works without pymilvus installed
+        from pymilvus import MilvusClient
+        client = MilvusClient(str(vector_store_dir / "milvus_side_characters.db"))
+    # Query embeddings are cached on disk, so re-running the test costs no embedding calls
+    embedding_fn = CachedEmbeddings(
+        GoogleGenerativeAIEmbeddings(model="models/text-embedding-004", google_api_key=google_api_key),
+        str(project_root / "data" / "cache" / "embeddings")
     )
     print("Clients initialized successfully.\n")
 
@@ -68,6 +100,10 @@ def main():
         
         # Get the collection name for the current archetype
         collection_name = archetype_db_map[archetype]
+        filter_kwargs = {}
+        if args.layout == "partitioned":
+            collection_name = PARTITIONED_COLLECTION
+            filter_kwargs = {"archetypes": [archetype], "min_confidence": args.min_confidence, "genre": args.genre}
         
         # Call the retriever function directly
         retrieved_context = retrieve_persona_examples(
@@ -75,7 +111,11 @@ def main():
             collection_name=collection_name,
             client=client,
             embedding_fn=embedding_fn,
-            archetype_name=archetype
+            archetype_name=archetype,
+            search_params=args.search_params,
+            rerank_k=args.rerank_k,
+            chunked=args.chunked,
+            **filter_kwargs
         )
         
         # Print the formatted output that would be sent to the LLM
@@ -1,6 +1,7 @@
 # src/side_character_app/app/agents.py
 
 
+import os
 from functools import partial
 from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain.tools import Tool
@@ -8,6 +9,8 @@ from langchain_core.prompts import ChatPromptTemplate
 # **NEW**: Import MessagesPlaceholder
 from langchain_core.prompts import MessagesPlaceholder
 from .tools import retrieve_persona_examples, RetrieverToolInput
+from ..vector_stores.numpy_store import NumpyVectorStore
+from ..vector_stores.partitions import PARTITIONED_COLLECTION
 
 # src/side_character_app/app/agents.py
 
@@ -72,10 +75,61 @@ ARCHETYPE_DB_MAP = {
 
 # In src/side_character_app/app/agents.py
 
-def create_agent(archetype_name: str, llm, client, embedding_fn) -> AgentExecutor:
-    """Creates a persona agent with a dedicated RAG tool and system prompt."""
+def open_vector_client(vector_store_dir: str):
+    """
+    Opens the vector store the agents retrieve from, chosen by PERSONA_VECTOR_BACKEND (.env).
+
+    "milvus" (the default) opens the Milvus Lite database; "numpy" opens the memory-mapped
+    export in `<vector_store_dir>/numpy` (see scripts/export_numpy_store.py), which starts
+    instantly, can be shared by many worker processes and does not need pymilvus.
+    """
+    if os.getenv("PERSONA_VECTOR_BACKEND", "milvus") == "numpy":
+        return NumpyVectorStore(os.path.join(vector_store_dir, "numpy"))
+    # Imported here so the NumPy backend works without pymilvus installed
+    from pymilvus import MilvusClient
+    return MilvusClient(os.path.join(vector_store_dir, "milvus_side_characters.db"))
+
+def retrieval_settings_from_env() -> dict:
+    """
+    Reads the vector store layout from the environment (.env).
+
+    With PERSONA_DB_LAYOUT=partitioned, agents search their archetype's partition of the
+    single partitioned collection, keeping conversations whose confidence is at least
+    PERSONA_MIN_CONFIDENCE (default 8) and, if PERSONA_GENRE is set, of that genre.
+    PERSONA_RERANK_K re-ranks that many candidates with full-precision vectors, for
+    stores built with reduced precision or quantization. PERSONA_CHUNKED=1 is for stores
+    built with --chunk-turns, so agents receive matching excerpts instead of whole
+    conversations.
+    """
+    settings = {}
+    if os.getenv("PERSONA_RERANK_K"):
+        settings["rerank_k"] = int(os.getenv("PERSONA_RERANK_K"))
+    if os.getenv("PERSONA_CHUNKED", "0").lower() in ("1", "true", "yes"):
+        settings["chunked"] = True
+    if os.getenv("PERSONA_DB_LAYOUT", "collections") == "partitioned":
+        settings.update({
+            "partitioned_collection": PARTITIONED_COLLECTION,
+            "min_confidence": int(os.getenv("PERSONA_MIN_CONFIDENCE", "8")),
+            "genre": os.getenv("PERSONA_GENRE") or None,
+        })
+    return settings
+
+def create_agent(archetype_name: str, llm, client, embedding_fn, search_params: dict = None,
+                 partitioned_collection: str = None, min_confidence: int = None, genre: str = None,
+                 rerank_k: int = 0, chunked: bool = False) -> AgentExecutor:
+    """Creates a persona agent with a dedicated RAG tool and system prompt.
+
+    `search_params` and `rerank_k` tune the vector search, and `chunked` is set for stores
+    of turn-window chunks (see retrieve_persona_examples).
+    With `partitioned_collection`, the agent searches its archetype's partition of that
+    collection, filtered by `min_confidence` and `genre`, instead of its own collection.
+    """
     system_prompt = ARCHETYPE_PROMPTS[archetype_name]
     collection_name = ARCHETYPE_DB_MAP[archetype_name]
+    filter_kwargs = {}
+    if partitioned_collection:
+        collection_name = partitioned_collection
+        filter_kwargs = {"archetypes": [archetype_name], "min_confidence": min_confidence, "genre": genre}
     
     # **THE CHANGE IS HERE**: We now also pass 'archetype_name' to our partial function.
     # This "bakes in" the archetype name for the tool used by this specific agent.
@@ -84,7 +138,11 @@ def create_agent(archetype_name: str, llm, client, embedding_fn) -> AgentExecuto
         collection_name=collection_name,
         client=client,
         embedding_fn=embedding_fn,
-        archetype_name=archetype_name
+        archetype_name=archetype_name,
+        search_params=search_params,
+        rerank_k=rerank_k,
+        chunked=chunked,
+        **filter_kwargs
     )
     
     retriever_tool = Tool(
@@ -107,9 +165,11 @@ def create_agent(archetype_name: str, llm, client, embedding_fn) -> AgentExecuto
     return AgentExecutor(agent=agent_runnable, tools=[retriever_tool], verbose=True)
 
 
-def create_all_agents(llm, client, embedding_fn) -> dict:
+def create_all_agents(llm, client, embedding_fn, search_params: dict = None, partitioned_collection: str = None,
+                      min_confidence: int = None, genre: str = None, rerank_k: int = 0, chunked: bool = False) -> dict:
     """Creates a dictionary of all agents, keyed by their archetype name."""
     return {
-        name: create_agent(name, llm, client, embedding_fn)
+        name: create_agent(name, llm, client, embedding_fn, search_params, partitioned_collection, min_confidence, genre,
+                           rerank_k, chunked)
         for name in ARCHETYPE_PROMPTS.keys()
     }
\ No newline at end of file
@@ -1,13 +1,55 @@
 # src/side_character_app/app/tools.py
 
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
-from pymilvus import MilvusClient
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
+from ..vector_stores.chunking import CHUNK_FIELDS, chunk_excerpt
+from ..vector_stores.partitions import partition_name, persona_filter
+from ..vector_stores.quantization import fit_vector, rerank_exact, vector_format
+from ..vector_stores.query_cache import QueryEmbeddingCache
+
+# (dimension, float16) of each searched collection, read once per client
+_VECTOR_FORMATS = {}
+RESULT_LIMIT = 5
+# Chunks fetched per result from chunked collections, as several may come from one conversation
+CHUNK_OVERFETCH = 3
+# Query embeddings kept in memory, shared by every agent and session of the process
+QUERY_CACHE_MAX_ENTRIES = 1024
+QUERY_CACHE_TTL_SECONDS = 3600
+_QUERY_CACHE = QueryEmbeddingCache(QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_TTL_SECONDS)
+
+def _collection_vector_format(client, collection_name: str) -> tuple:
+    key = (id(client), collection_name)
+    if key not in _VECTOR_FORMATS:
+        _VECTOR_FORMATS[key] = vector_format(client, collection_name)
+    return _VECTOR_FORMATS[key]
+
+def embed_query_cached(query: str, embedding_fn: GoogleGenerativeAIEmbeddings) -> List[float]:
+    """Embeds a retriever query through the in-memory query cache (see QueryEmbeddingCache)."""
+    return _QUERY_CACHE.get((id(embedding_fn), query), lambda: embedding_fn.embed_query(query))
+
+def query_cache_stats() -> dict:
+    """Returns the hit/miss counters of the retriever's query embedding cache."""
+    return _QUERY_CACHE.stats()
+
 class RetrieverToolInput(BaseModel):
     """Input schema for the retriever tool."""
     query: str = Field(description="The user's query to search for relevant conversation examples.")
 
+def best_chunk_per_conversation(hits: List[Dict], limit: int) -> List[Dict]:
+    """Keeps the first (best) hit of each parent conversation, up to `limit` hits."""
+    seen, kept = set(), []
+    for hit in hits:
+        parent_id = hit.get("entity", {}).get("parent_id")
+        if parent_id is None:
+            # A whole conversation is its own parent
+            parent_id = hit.get("id")
+        if parent_id not in seen:
+            seen.add(parent_id)
+            kept.append(hit)
+    return kept[:limit]
+
 def format_retrieved_docs(docs: list, archetype_name: str) -> str:
     """Helper function to format Milvus search results into a clean string."""
     if not docs or not docs[0]:
@@ -17,28 +59,84 @@ def format_retrieved_docs(docs: list, archetype_name: str) -> str:
         entity = doc.get('entity', {})
         character = entity.get('character_name', 'Unknown Character')
         genres = entity.get('genres', 'unknown genre')
+        if isinstance(genres, list):
+            # The partitioned collection stores genres as an array
+            genres = ",".join(genres) or 'unknown genre'
+        archetype = entity.get('archetype') or archetype_name
         conversation = entity.get('conversation', 'N/A')
         
         # **THE CHANGE IS HERE**: The header now includes the archetype.
         header = (
             f"Example {i+1}: In the following conversation, the character '{character}' "
-            f"acts as a '{archetype_name}' in a movie with genres: {genres}.\n"
+            f"acts as a '{archetype}' in a movie with genres: {genres}.\n"
         )
         
-        formatted_convo = f"Conversation:\n---\n{conversation}\n---\n\n"
+        if entity.get('parent_id') is not None:
+            # A chunk: only the matching turns and their stored context
+            formatted_convo = f"Conversation excerpt:\n---\n{chunk_excerpt(entity)}\n---\n\n"
+        else:
+            formatted_convo = f"Conversation:\n---\n{conversation}\n---\n\n"
         output += header + formatted_convo
     return output
 
-def retrieve_persona_examples(query: str, collection_name: str, client: MilvusClient, embedding_fn: GoogleGenerativeAIEmbeddings, archetype_name: str) -> str:
-    """Searches a specific persona's conversation database for relevant examples."""
+def retrieve_persona_examples(query: str, collection_name: str, client, embedding_fn: GoogleGenerativeAIEmbeddings, archetype_name: str,
+                              search_params: Optional[Dict] = None, archetypes: Optional[List[str]] = None,
+                              min_confidence: Optional[int] = None, genre: Optional[str] = None, filter_expr: str = "",
+                              rerank_k: int = 0, chunked: bool = False) -> str:
+    """
+    Searches a specific persona's conversation database for relevant examples.
+
+    `client` is a MilvusClient, or a NumpyVectorStore exported from one (see
+    vector_stores/numpy_store.py), which needs neither pymilvus nor a database file.
+
+    `search_params` is passed to Milvus as is, e.g. IndexConfig.milvus_search_params() to
+    tune nprobe (IVF_FLAT) or ef (HNSW); by default the index's defaults are used.
+
+    The remaining arguments apply to the partitioned collection (see
+    build_partitioned_persona_db): `archetypes` restricts the search to those archetypes'
+    partitions, so the others are never scanned, and `min_confidence`, `genre` and a raw
+    `filter_expr` become a filter on the scalar fields.
+
+    The query is converted to the collection's stored format (truncated and/or float16, see
+    IndexConfig). With `rerank_k` greater than 5, that many candidates are fetched from the
+    (possibly compressed) index and re-ranked by exact cosine similarity of full-precision
+    embeddings; the candidates' document embeddings are served by the embedding cache when
+    embedding_fn is a CachedEmbeddings that built the store.
+
+    Set `chunked` for collections built with a ChunkConfig: more chunks are fetched, only
+    the best chunk of each conversation is kept, and each example shows the matching turns
+    with their stored context instead of the whole conversation.
+
+    Query embeddings are cached in memory for an hour (see embed_query_cached), and
+    identical queries made at the same time share one embedding request.
+    """
     try:
-        query_vector = embedding_fn.embed_query(query)
+        query_vector = embed_query_cached(query, embedding_fn)
+        dimension, float16 = _collection_vector_format(client, collection_name)
+        search_kwargs = {"search_params": search_params} if search_params else {}
+        output_fields = ["conversation", "character_name", "genres"]
+        if chunked:
+            output_fields += list(CHUNK_FIELDS)
+        if archetypes:
+            search_kwargs["partition_names"] = [partition_name(archetype) for archetype in archetypes]
+            output_fields.append("archetype")
+        filter_expression = persona_filter(min_confidence, genre, filter_expr)
+        if filter_expression:
+            search_kwargs["filter"] = filter_expression
         search_res = client.search(
             collection_name=collection_name,
-            data=[query_vector],
-            limit=5, # Using 5 to provide more context
-            output_fields=["conversation", "character_name", "genres"]
+            data=[fit_vector(query_vector, dimension, float16)],
+            # Using 5 to provide more context (more candidates when re-ranking or chunked)
+            limit=max(RESULT_LIMIT, rerank_k) * (CHUNK_OVERFETCH if chunked else 1),
+            output_fields=output_fields,
+            **search_kwargs
         )
+        if rerank_k > RESULT_LIMIT and search_res and search_res[0]:
+            hits = search_res[0]
+            full_vectors = embedding_fn.embed_documents([hit["entity"]["conversation"] for hit in hits])
+            search_res = [rerank_exact(query_vector, hits, full_vectors, len(hits) if chunked else RESULT_LIMIT)]
+        if chunked and search_res:
+            search_res = [best_chunk_per_conversation(search_res[0], RESULT_LIMIT)]
         # Pass the archetype_name down to the formatting function
         return format_retrieved_docs(search_res, archetype_name=archetype_name)
     except Exception as e:
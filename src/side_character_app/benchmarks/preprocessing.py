@@ -0,0 +1,113 @@
+# src/side_character_app/benchmarks/preprocessing.py
+
+import gc
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+import pandas as pd
+
+from ..data_processing.loader import load_and_clean_data
+from ..data_processing.cache import load_cached_data
+from ..data_processing.builder import build_side_character_conversations, filter_by_conversation_count
+from ..data_processing.parallel import build_side_character_conversations_parallel
+from ..data_processing.streaming import write_personas_jsonl
+
+def measure(fn: Callable, track_memory: bool = True) -> tuple:
+    """
+    Runs `fn` once for wall time and, optionally, once more under tracemalloc for peak memory.
+
+    Timing and memory are measured in separate runs because tracing slows allocations down.
+
+    Returns:
+        A tuple of (fn's result from the timed run, metrics dict).
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = fn()
+    metrics = {"seconds": round(time.perf_counter() - start, 4)}
+
+    if track_memory:
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        metrics["peak_mb"] = round(peak / (1024 * 1024), 2)
+    return result, metrics
+
+def git_commit(repo_dir: str) -> str:
+    """Returns the current git commit of the repository, or 'unknown'."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=repo_dir,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def run_preprocessing_benchmark(data_dir: str, workers: int = 1, track_memory: bool = True) -> dict:
+    """
+    Times and memory-profiles each preprocessing stage on the corpus in `data_dir`.
+
+    Stages: raw load, cold and warm cache loads, the serial build, the optional parallel
+    build, the conversation-count filter and the streaming JSONL write.
+    """
+    stages = {}
+    dataframes, stages["load_and_clean_data"] = measure(lambda: load_and_clean_data(data_dir), track_memory)
+
+    cache_dir = tempfile.mkdtemp(prefix="bench_cache_")
+    scratch_dir = tempfile.mkdtemp(prefix="bench_out_")
+    try:
+        def cold_cache_load():
+            shutil.rmtree(cache_dir)
+            os.makedirs(cache_dir)
+            return load_cached_data(data_dir, cache_dir)
+        _, stages["load_cached_data_cold"] = measure(cold_cache_load, track_memory)
+        _, stages["load_cached_data_warm"] = measure(lambda: dict(load_cached_data(data_dir, cache_dir)), track_memory)
+
+        results, stages["build_side_character_conversations"] = measure(
+            lambda: build_side_character_conversations(dataframes), track_memory)
+        if workers > 1:
+            _, stages["build_side_character_conversations_parallel"] = measure(
+                lambda: build_side_character_conversations_parallel(dataframes, workers), track_memory)
+        filtered, stages["filter_by_conversation_count"] = measure(
+            lambda: filter_by_conversation_count(results, 50), track_memory)
+        _, stages["write_personas_jsonl"] = measure(
+            lambda: write_personas_jsonl(filtered, os.path.join(scratch_dir, "personas.jsonl")), track_memory)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    return {
+        "corpus": {name: len(df) for name, df in dataframes.items()},
+        "personas": len(filtered),
+        "stages": stages,
+    }
+
+def environment_info(repo_dir: str) -> dict:
+    """Collects the metadata stored alongside benchmark results."""
+    return {
+        "git_commit": git_commit(repo_dir),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "cpu_count": os.cpu_count(),
+    }
+
+def compare_results(current: dict, baseline: dict) -> list:
+    """Returns (scale, stage, baseline seconds, current seconds, ratio) rows for stages present in both runs."""
+    rows = []
+    for scale, run in current["runs"].items():
+        base_run = baseline.get("runs", {}).get(scale)
+        if not base_run:
+            continue
+        for stage, metrics in run["stages"].items():
+            base_metrics = base_run["stages"].get(stage)
+            if base_metrics and base_metrics["seconds"] > 0:
+                rows.append((scale, stage, base_metrics["seconds"], metrics["seconds"],
+                             metrics["seconds"] / base_metrics["seconds"]))
+    return rows
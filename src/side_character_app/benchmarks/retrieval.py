@@ -0,0 +1,194 @@
+# src/side_character_app/benchmarks/retrieval.py
+
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from pymilvus import MilvusClient
+
+from ..vector_stores.builder import ID_QUERY_BATCH_SIZE
+from ..vector_stores.index_config import IndexConfig, collection_schema
+from ..vector_stores.quantization import fit_vector, rerank_exact
+
+# Index settings compared by default: exact search, then IVF_FLAT and HNSW at increasing search effort
+DEFAULT_BENCHMARK_CONFIGS = [
+    IndexConfig("FLAT"),
+    *[IndexConfig("IVF_FLAT", build_params={"nlist": 128}, search_params={"nprobe": nprobe}) for nprobe in (4, 16, 64)],
+    *[IndexConfig("HNSW", build_params={"M": 16, "efConstruction": 200}, search_params={"ef": ef}) for ef in (16, 64, 256)],
+]
+# Storage formats compared with --compression: full precision, float16, truncation, int8 and PQ
+COMPRESSION_BENCHMARK_CONFIGS = [
+    IndexConfig("FLAT"),
+    IndexConfig("FLAT", precision="float16"),
+    IndexConfig("FLAT", truncate_dim=256),
+    IndexConfig("FLAT", precision="float16", truncate_dim=256),
+    IndexConfig("IVF_SQ8", search_params={"nprobe": 32}),
+    IndexConfig("IVF_PQ", search_params={"nprobe": 32}),
+]
+INSERT_BATCH_SIZE = 1000
+
+def fetch_vectors(client: MilvusClient, collection_name: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns (ids, vectors) for every entity of a collection."""
+    ids, vectors = [], []
+    iterator = client.query_iterator(collection_name=collection_name, batch_size=ID_QUERY_BATCH_SIZE,
+                                     filter="id >= 0", output_fields=["id", "vector"])
+    while True:
+        batch = iterator.next()
+        if not batch:
+            iterator.close()
+            break
+        ids.extend(item["id"] for item in batch)
+        vectors.extend(item["vector"] for item in batch)
+    return np.asarray(ids, dtype=np.int64), np.asarray(vectors, dtype=np.float32)
+
+def sample_queries(vectors: np.ndarray, n_queries: int, seed: int = 0) -> np.ndarray:
+    """
+    Builds query vectors as midpoints of random pairs of stored vectors.
+
+    The queries resemble the data without being in the collection themselves, so an index
+    does not get credit for trivially finding a query's own entry.
+    """
+    rng = np.random.default_rng(seed)
+    first = rng.integers(0, len(vectors), n_queries)
+    second = rng.integers(0, len(vectors), n_queries)
+    return (vectors[first] + vectors[second]) / 2
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int, metric_type: str) -> np.ndarray:
+    """Returns the row indexes of the true `k` nearest neighbors of each query, best first."""
+    if metric_type == "L2":
+        scores = -(np.sum(queries ** 2, axis=1)[:, None] - 2 * queries @ vectors.T + np.sum(vectors ** 2, axis=1)[None, :])
+    elif metric_type == "COSINE":
+        scores = (queries / np.linalg.norm(queries, axis=1, keepdims=True)) @ \
+                 (vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)).T
+    else:
+        scores = queries @ vectors.T
+    k = min(k, vectors.shape[0])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+def _build_key(config: IndexConfig) -> tuple:
+    return (config.index_type, config.metric_type, json.dumps(config.build_params, sort_keys=True),
+            config.precision, config.truncate_dim)
+
+def _latency_ms(latencies: List[float]) -> Dict[str, float]:
+    return {f"p{q}": round(float(np.percentile(latencies, q)) * 1000, 3) for q in (50, 95, 99)}
+
+def benchmark_collection(bench_client: MilvusClient, ids: np.ndarray, vectors: np.ndarray, queries: np.ndarray,
+                         configs: List[IndexConfig], k: int = 5, collection_prefix: str = "bench",
+                         rerank_k: int = 0) -> List[Dict]:
+    """
+    Measures recall@k, query latency and vector memory of each index setting on one set of vectors.
+
+    The vectors are loaded into a scratch collection of `bench_client` once per distinct
+    index build (settings that only differ in search parameters share it), in the setting's
+    storage format, and every query is sent on its own, as the retriever tool does. Recall@k
+    is the share of the exact top-k (brute force in NumPy over the full-precision vectors,
+    with the setting's metric) that the index returned. With `rerank_k`, the top `rerank_k`
+    candidates are also re-ranked with the full-precision vectors, as retrieve_persona_examples
+    does, and the recall and latency after re-ranking are reported too. Memory is estimated
+    with IndexConfig.bytes_per_vector and compared with float32 vectors.
+
+    Returns:
+        One result dict per setting, in the order of `configs`.
+    """
+    results = []
+    built = {}
+    truth = {}
+    dimension = vectors.shape[1]
+    full_precision_bytes = IndexConfig("FLAT").bytes_per_vector(dimension) * len(ids)
+    rows = {int(row_id): i for i, row_id in enumerate(ids)}
+    limit = max(k, rerank_k)
+    try:
+        for config in configs:
+            key = _build_key(config)
+            stored_dimension = config.stored_dimension(dimension)
+            float16 = config.precision == "float16"
+            if key not in built:
+                collection_name = f"{collection_prefix}_{len(built)}"
+                if bench_client.has_collection(collection_name=collection_name):
+                    bench_client.drop_collection(collection_name=collection_name)
+                start = time.perf_counter()
+                bench_client.create_collection(collection_name=collection_name,
+                                               schema=collection_schema(stored_dimension, config.vector_datatype),
+                                               index_params=config.index_params(bench_client, dimension))
+                for offset in range(0, len(ids), INSERT_BATCH_SIZE):
+                    bench_client.insert(collection_name=collection_name, data=[
+                        {"id": int(row_id), "vector": fit_vector(vector.tolist(), stored_dimension, float16)}
+                        for row_id, vector in zip(ids[offset:offset + INSERT_BATCH_SIZE], vectors[offset:offset + INSERT_BATCH_SIZE])
+                    ])
+                built[key] = (collection_name, time.perf_counter() - start)
+            if config.metric_type not in truth:
+                truth[config.metric_type] = ids[exact_top_k(vectors, queries, k, config.metric_type)]
+
+            collection_name, build_seconds = built[key]
+            search_params = config.milvus_search_params()
+            latencies, recalls, reranked_latencies, reranked_recalls = [], [], [], []
+            for query, true_ids in zip(queries, truth[config.metric_type]):
+                true_ids = set(true_ids.tolist())
+                start = time.perf_counter()
+                hits = bench_client.search(collection_name=collection_name, data=[fit_vector(query.tolist(), stored_dimension, float16)],
+                                           limit=limit, search_params=search_params)[0]
+                latencies.append(time.perf_counter() - start)
+                recalls.append(len({hit["id"] for hit in hits[:k]} & true_ids) / len(true_ids))
+                if rerank_k:
+                    reranked = rerank_exact(query, hits, vectors[[rows[hit["id"]] for hit in hits]], k)
+                    reranked_latencies.append(time.perf_counter() - start)
+                    reranked_recalls.append(len({hit["id"] for hit in reranked} & true_ids) / len(true_ids))
+            memory_bytes = config.bytes_per_vector(dimension) * len(ids)
+            result = {
+                "setting": config.name,
+                "index_type": config.index_type,
+                "metric_type": config.metric_type,
+                "build_params": config.resolved_build_params(dimension),
+                "search_params": config.search_params,
+                "precision": config.precision,
+                "stored_dimension": stored_dimension,
+                "build_seconds": round(build_seconds, 4),
+                f"recall_at_{k}": round(float(np.mean(recalls)), 4),
+                "latency_ms": _latency_ms(latencies),
+                "vector_memory_mb": round(memory_bytes / (1024 * 1024), 3),
+                "memory_saved": round(1 - memory_bytes / full_precision_bytes, 4),
+            }
+            if rerank_k:
+                result[f"recall_at_{k}_reranked"] = round(float(np.mean(reranked_recalls)), 4)
+                result["reranked_latency_ms"] = _latency_ms(reranked_latencies)
+            results.append(result)
+    finally:
+        for collection_name, _ in built.values():
+            bench_client.drop_collection(collection_name=collection_name)
+    return results
+
+def run_retrieval_benchmark(client: MilvusClient, bench_client: MilvusClient, collections: List[str],
+                            configs: Optional[List[IndexConfig]] = None, k: int = 5, n_queries: int = 200, seed: int = 0,
+                            rerank_k: int = 0) -> Dict:
+    """
+    Benchmarks index settings on the vectors of existing persona collections.
+
+    Vectors are read from `client` (the built vector store, left untouched) and indexed
+    in scratch collections of `bench_client`. Collections that do not exist or are empty
+    are skipped. See benchmark_collection for the measurements and `rerank_k`.
+
+    Returns:
+        {collection_name: {"entities": n, "queries": n, "results": [...]}}.
+    """
+    configs = configs or DEFAULT_BENCHMARK_CONFIGS
+    report = {}
+    for collection_name in collections:
+        if not client.has_collection(collection_name=collection_name):
+            print(f"Collection '{collection_name}' not found. Skipping.")
+            continue
+        ids, vectors = fetch_vectors(client, collection_name)
+        if not len(ids):
+            print(f"Collection '{collection_name}' is empty. Skipping.")
+            continue
+        print(f"Benchmarking {len(configs)} index settings on '{collection_name}' ({len(ids)} vectors)...")
+        queries = sample_queries(vectors, n_queries, seed)
+        report[collection_name] = {
+            "entities": int(len(ids)),
+            "queries": n_queries,
+            "results": benchmark_collection(bench_client, ids, vectors, queries, configs, k,
+                                            collection_prefix=f"bench_{collection_name}", rerank_k=rerank_k),
+        }
+    return report
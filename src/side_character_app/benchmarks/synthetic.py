@@ -0,0 +1,90 @@
+# src/side_character_app/benchmarks/synthetic.py
+
+import os
+import random
+
+# Per-movie averages of the Cornell Movie-Dialogs corpus (617 movies at scale 1x)
+CORNELL_MOVIES = 617
+CHARACTERS_PER_MOVIE = 15
+CONVERSATIONS_PER_MOVIE = 135
+MAX_LINES_PER_CONVERSATION = 7
+CREDITED_FRACTION = 0.35
+
+GENRES = ["action", "adventure", "comedy", "crime", "drama", "fantasy", "horror",
+          "mystery", "romance", "sci-fi", "thriller", "war", "western"]
+VOCABULARY = ("i you the a to what it is no yes we know don't me that do not here now "
+              "think want go come why money gun car home love kill tell well look right "
+              "okay sure never always maybe listen please sorry thanks wait hey man").split()
+NAME_SYLLABLES = ["AL", "BER", "CA", "DEN", "E", "FRA", "GOR", "HAL", "IN", "JO", "KAT", "LO",
+                  "MAR", "NED", "O", "PET", "RI", "SAM", "TON", "VIC", "WIL", "ZE"]
+
+def _sentence(rng: random.Random) -> str:
+    """Returns a random line of dialogue, occasionally with quoted speech or an embedded tab."""
+    words = rng.choices(VOCABULARY, k=rng.randint(1, 30))
+    text = " ".join(words).capitalize()
+    roll = rng.random()
+    if roll < 0.03:
+        text += ' ""Really?""'
+    elif roll < 0.04:
+        text += "\tand then"
+    return text + rng.choice([".", "?", "!", "..."])
+
+def _character_name(rng: random.Random) -> str:
+    """Returns a random upper-case character name."""
+    return "".join(rng.choices(NAME_SYLLABLES, k=rng.randint(1, 3)))
+
+def generate_corpus(output_dir: str, scale: float = 1.0, seed: int = 0) -> dict:
+    """
+    Writes a synthetic corpus in the layout expected by load_and_clean_data.
+
+    The four .tsv files mirror the Cornell files' formats, and the number of movies is
+    `scale` times Cornell's, with Cornell-like characters, conversations and lines per movie.
+
+    Args:
+        output_dir: Directory the four .tsv files are written to.
+        scale: Corpus size relative to Cornell (1, 10, 100, ...).
+        seed: Seed for the random generator, so a scale/seed pair is reproducible.
+
+    Returns:
+        A dictionary of row counts per generated file.
+    """
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    num_movies = max(1, int(CORNELL_MOVIES * scale))
+    counts = {"movies": num_movies, "characters": 0, "lines": 0, "conversations": 0}
+    open_tsv = lambda name: open(os.path.join(output_dir, name), "w", encoding="iso-8859-1")
+
+    with open_tsv("movie_titles_metadata.tsv") as titles_f, \
+         open_tsv("movie_characters_metadata.tsv") as characters_f, \
+         open_tsv("movie_lines.tsv") as lines_f, \
+         open_tsv("movie_conversations.tsv") as conversations_f:
+        char_id = line_id = 0
+        for movie in range(num_movies):
+            movie_id = f"m{movie}"
+            title = " ".join(rng.choices(VOCABULARY, k=rng.randint(1, 4)))
+            genres = " ".join(f"'{g}'" for g in rng.sample(GENRES, rng.randint(1, 4)))
+            titles_f.write(f"{movie_id}\t{title}\t{rng.randint(1930, 2010)}\t{rng.uniform(2, 9):.2f}\t"
+                           f"{rng.randint(10, 400000)}\t[{genres}]\n")
+
+            characters = []
+            for _ in range(rng.randint(2, 2 * CHARACTERS_PER_MOVIE - 2)):
+                name = _character_name(rng)
+                credit_pos = str(rng.randint(1, 12)) if rng.random() < CREDITED_FRACTION else "?"
+                characters.append((f"u{char_id}", name))
+                characters_f.write(f"u{char_id}\t{name}\t{movie_id}\t{title}\t{rng.choice('mf?')}\t{credit_pos}\n")
+                char_id += 1
+            counts["characters"] += len(characters)
+
+            for _ in range(rng.randint(1, 2 * CONVERSATIONS_PER_MOVIE - 1)):
+                speakers = rng.sample(characters, 2)
+                utterance_ids = []
+                for turn in range(rng.randint(2, MAX_LINES_PER_CONVERSATION)):
+                    speaker_id, speaker_name = speakers[turn % 2]
+                    lines_f.write(f"L{line_id}\t{speaker_id}\t{movie_id}\t{speaker_name}\t{_sentence(rng)}\n")
+                    utterance_ids.append(f"'L{line_id}'")
+                    line_id += 1
+                conversations_f.write(f"{speakers[0][0]}\t{speakers[1][0]}\t{movie_id}\t[{' '.join(utterance_ids)}]\n")
+                counts["conversations"] += 1
+        counts["lines"] = line_id
+
+    return counts
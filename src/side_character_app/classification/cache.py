@@ -0,0 +1,92 @@
+# src/side_character_app/classification/cache.py
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional, Type
+
+from pydantic import BaseModel
+
+class ClassificationCache:
+    """
+    Persistent, content-addressed cache of classification responses backed by SQLite.
+
+    Entries are keyed on a hash of the fully built prompt, the model name and the response
+    schema, so a cached answer is only reused for exactly the same request, regardless of
+    which run, branch or output file produced it. When the cache grows beyond `max_entries`,
+    the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS classifications ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON classifications (last_used)")
+        self.conn.commit()
+        self.entries = self.conn.execute("SELECT COUNT(*) FROM classifications").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(prompt: str, model_name: str, schema: Type[BaseModel]) -> str:
+        """Hashes everything that determines the model's answer into a cache key."""
+        payload = json.dumps([model_name, schema.model_json_schema(), prompt], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached JSON response for `key`, or None on a miss."""
+        with self.lock:
+            row = self.conn.execute("SELECT response FROM classifications WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute("UPDATE classifications SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+            return row[0]
+
+    def put(self, key: str, response: str):
+        """Stores a JSON response, evicting least recently used entries beyond `max_entries`."""
+        now = time.time()
+        with self.lock:
+            existing = self.conn.execute("SELECT created FROM classifications WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO classifications (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, existing[0] if existing else now, now),
+            )
+            if existing is None:
+                self.entries += 1
+            if self.entries > self.max_entries:
+                # Evict down to 90% of the limit so eviction runs rarely
+                excess = self.entries - int(self.max_entries * 0.9)
+                self.conn.execute(
+                    "DELETE FROM classifications WHERE key IN "
+                    "(SELECT key FROM classifications ORDER BY last_used LIMIT ?)", (excess,)
+                )
+                self.evictions += excess
+                self.entries -= excess
+            self.conn.commit()
+
+    def stats(self) -> dict:
+        """Returns hit/miss/eviction counters for this session and the current entry count."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": self.entries,
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -1,21 +1,85 @@
 # src/side_character_app/classification/classifier.py
 
 from google import genai
-from typing import Dict
+from typing import Callable, Dict, List, Optional
 import re
-from .schemas import SideCharacterClassification
+from .cache import ClassificationCache
+from .schemas import SideCharacterClassification, SideCharacterBatchClassification
 
 MODEL_NAME = "gemini-2.0-flash"
 
-def build_prompt(entry: Dict) -> str:
+LABEL_DEFINITIONS = """- Comedic Relief: A character who provides humor and lightens the mood.
+- Wise Mentor: An experienced, trusted advisor who guides the protagonist.
+- Skeptical Realist: A grounded, often cynical character who questions plans and points out harsh realities.
+- Loyal Sidekick: A faithful companion who offers emotional support and stands by the protagonist."""
+
+# Rough characters-per-token ratio for English dialogue; avoids a tokenizer dependency
+CHARS_PER_TOKEN = 4
+# Conversations whose word sets overlap more than this with an already chosen one are deprioritized
+DUPLICATE_SIMILARITY = 0.8
+
+def _conversation_order(key: str) -> int:
+    return int(re.search(r'\d+', key).group())
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the number of model tokens in a piece of text."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def select_conversations(entry: Dict, token_budget: Optional[int] = None) -> Dict:
+    """
+    Picks a representative subset of a character's conversations within a token budget.
+
+    Conversations are considered longest first; one whose words largely repeat an already
+    chosen conversation is only used if budget remains after all distinct ones. If nothing
+    fits, the shortest conversation is used on its own. The choice is deterministic.
+
+    Returns:
+        A dict with the chosen conversation keys in chronological order ("used"), and the
+        estimated dialogue tokens of all conversations, of the chosen ones, and saved.
+    """
+    conversations = entry["conversations"]
+    tokens = {key: estimate_tokens(text) for key, text in conversations.items()}
+    total_tokens = sum(tokens.values())
+    if token_budget is None or total_tokens <= token_budget:
+        # Sort conversations by their key number to ensure chronological order
+        used = sorted(conversations, key=_conversation_order)
+    else:
+        ranked = sorted(conversations, key=lambda k: (-tokens[k], _conversation_order(k)))
+        words = {key: set(conversations[key].lower().split()) for key in ranked}
+        chosen, deferred, remaining = [], [], token_budget
+        for key in ranked:
+            similar = any(
+                len(words[key] & words[other]) / max(1, len(words[key] | words[other])) > DUPLICATE_SIMILARITY
+                for other in chosen
+            )
+            if similar:
+                deferred.append(key)
+            elif tokens[key] <= remaining:
+                chosen.append(key)
+                remaining -= tokens[key]
+        for key in deferred:
+            if tokens[key] <= remaining:
+                chosen.append(key)
+                remaining -= tokens[key]
+        if not chosen:
+            chosen = [min(ranked, key=lambda k: (tokens[k], _conversation_order(k)))]
+        used = sorted(chosen, key=_conversation_order)
+
+    used_tokens = sum(tokens[key] for key in used)
+    return {"used": used, "total_tokens": total_tokens, "used_tokens": used_tokens,
+            "saved_tokens": total_tokens - used_tokens}
+
+def build_dialog_text(entry: Dict, token_budget: Optional[int] = None) -> str:
+    """Joins a character's conversations (within the optional token budget) in chronological order."""
+    used = select_conversations(entry, token_budget)["used"]
+    return "\n\n".join(entry["conversations"][key] for key in used)
+
+def build_prompt(entry: Dict, token_budget: Optional[int] = None) -> str:
     """Constructs the classification prompt for a given character entry."""
     character = entry["side_character_name"]
     movie = entry["movie_title"]
     genre = ", ".join(entry.get("genre", []))
-    
-    # Sort conversations by their key number to ensure chronological order
-    sorted_convs = sorted(entry["conversations"].items(), key=lambda x: int(re.search(r'\d+', x[0]).group()))
-    dialog_text = "\n\n".join(conv for _, conv in sorted_convs)
+    dialog_text = build_dialog_text(entry, token_budget)
 
     prompt = f"""
 You are a film analysis AI. Based on the following character dialogues, classify the character into one of four primary side-character archetypes.
@@ -31,38 +95,131 @@ Dialogues:
 
 Choose exactly one of the following labels:
 
-- Comedic Relief: A character who provides humor and lightens the mood.
-- Wise Mentor: An experienced, trusted advisor who guides the protagonist.
-- Skeptical Realist: A grounded, often cynical character who questions plans and points out harsh realities.
-- Loyal Sidekick: A faithful companion who offers emotional support and stands by the protagonist.
+{LABEL_DEFINITIONS}
 
 Return your output in a structured JSON format.
 """
     return prompt.strip()
 
+def build_batch_prompt(entries: List[Dict], token_budget: Optional[int] = None) -> str:
+    """Constructs one classification prompt covering several characters, numbered from 1."""
+    sections = []
+    for index, entry in enumerate(entries, start=1):
+        genre = ", ".join(entry.get("genre", []))
+        sections.append(f"""### Character {index}
+Character: {entry["side_character_name"]}
+Movie: {entry["movie_title"]}
+Genres: {genre}
+
+Dialogues:
+{build_dialog_text(entry, token_budget)}""")
+    characters_text = "\n\n".join(sections)
 
-# **FIX**: Reverted to the original, working API call structure.
-def classify_character(client: genai.client.Client, entry: Dict) -> SideCharacterClassification:
-    """
-    Calls the Gemini API to classify a character based on their dialogues.
+    prompt = f"""
+You are a film analysis AI. Below are the dialogues of {len(entries)} different characters. Classify each character, independently of the others, into one of four primary side-character archetypes.
 
-    Args:
-        client: The initialized Gemini API client.
-        entry: A dictionary containing the character's data.
+For each character, also provide a confidence score from 1 to 10 indicating how strongly you believe the character fits that archetype.
 
-    Returns:
-        A validated SideCharacterClassification object.
+{characters_text}
+
+For each character, choose exactly one of the following labels:
+
+{LABEL_DEFINITIONS}
+
+Return your output in a structured JSON format with exactly one classification per character, using the character's number (1 to {len(entries)}) as its character_index.
+"""
+    return prompt.strip()
+
+
+def _generate(client: genai.client.Client, prompt: str, schema, cache: Optional[ClassificationCache],
+              before_request: Optional[Callable[[], None]], after_response: Optional[Callable[[object], None]] = None):
     """
-    prompt = build_prompt(entry)
+    Returns the parsed response for a prompt, consulting the cache before calling the API.
 
+    `before_request` is invoked only when a real API request is about to be made (e.g. to
+    take a rate-limit token), so cache hits cost nothing. `after_response` receives the raw
+    API response (e.g. to record token usage).
+    """
+    key = ClassificationCache.make_key(prompt, MODEL_NAME, schema) if cache else None
+    if cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return schema.model_validate_json(cached)
+
+    if before_request:
+        before_request()
     response = client.models.generate_content(
         model=MODEL_NAME,
         contents=prompt,
         config={
             "response_mime_type": "application/json",
-            "response_schema": SideCharacterClassification,
+            "response_schema": schema,
         },
     )
+    if after_response:
+        after_response(response)
 
     # The original .parsed attribute is correct for this client structure
-    return response.parsed
\ No newline at end of file
+    parsed = response.parsed
+    if cache and parsed is not None:
+        cache.put(key, parsed.model_dump_json())
+    return parsed
+
+
+# **FIX**: Reverted to the original, working API call structure.
+def classify_character(client: genai.client.Client, entry: Dict, cache: Optional[ClassificationCache] = None,
+                       before_request: Optional[Callable[[], None]] = None,
+                       token_budget: Optional[int] = None,
+                       after_response: Optional[Callable[[object], None]] = None) -> SideCharacterClassification:
+    """
+    Calls the Gemini API to classify a character based on their dialogues.
+
+    Args:
+        client: The initialized Gemini API client.
+        entry: A dictionary containing the character's data.
+        cache: Optional result cache consulted before (and filled after) the API call.
+        before_request: Optional callback run right before an actual API request.
+        token_budget: Optional limit on the dialogue tokens included in the prompt.
+        after_response: Optional callback receiving the raw API response.
+
+    Returns:
+        A validated SideCharacterClassification object.
+    """
+    prompt = build_prompt(entry, token_budget)
+    return _generate(client, prompt, SideCharacterClassification, cache, before_request, after_response)
+
+def classify_characters_batch(client: genai.client.Client, entries: List[Dict], cache: Optional[ClassificationCache] = None,
+                              before_request: Optional[Callable[[], None]] = None,
+                              token_budget: Optional[int] = None,
+                              after_response: Optional[Callable[[object], None]] = None) -> List[SideCharacterClassification]:
+    """
+    Classifies several characters with a single Gemini API call.
+
+    Args:
+        client: The initialized Gemini API client.
+        entries: The character entries to classify together.
+        cache: Optional result cache consulted before (and filled after) the API call.
+        before_request: Optional callback run right before an actual API request.
+        token_budget: Optional per-character limit on the dialogue tokens included in the prompt.
+        after_response: Optional callback receiving the raw API response.
+
+    Returns:
+        One validated SideCharacterClassification per entry, in the same order.
+
+    Raises:
+        ValueError: If the response cannot be parsed or does not cover every character
+            exactly once; callers should fall back to classify_character.
+    """
+    prompt = build_batch_prompt(entries, token_budget)
+    batch = _generate(client, prompt, SideCharacterBatchClassification, cache, before_request, after_response)
+
+    if batch is None:
+        raise ValueError("Batched classification response could not be parsed.")
+    by_index = {item.character_index: item for item in batch.classifications}
+    if len(batch.classifications) != len(entries) or set(by_index) != set(range(1, len(entries) + 1)):
+        raise ValueError(f"Batched classification returned indices {sorted(by_index)} for {len(entries)} characters.")
+
+    return [
+        SideCharacterClassification(label=by_index[i].label, confidence=by_index[i].confidence)
+        for i in range(1, len(entries) + 1)
+    ]
@@ -0,0 +1,278 @@
+# src/side_character_app/classification/engine.py
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from .cache import ClassificationCache
+from .classifier import classify_character, classify_characters_batch, build_dialog_text
+from .local_model import LocalCascade
+from .schemas import SideCharacterClassification
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True if the exception text looks like a 429 / RESOURCE_EXHAUSTED response."""
+    error_text = str(error).upper()
+    return "429" in error_text and ("RESOURCE_EXHAUSTED" in error_text or "TOO MANY REQUESTS" in error_text)
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: random.Random) -> float:
+    """Full-jitter exponential backoff: a random delay in [0, min(cap, base * 2**attempt)]."""
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting requests per minute.
+
+    Tokens refill continuously at `requests_per_minute / 60` per second up to `capacity`,
+    so short bursts are allowed while the long-run rate stays within the quota.
+    """
+
+    def __init__(self, requests_per_minute: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Blocks until a token is available and returns the number of seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+@dataclass
+class ClassificationOutcome:
+    """
+    The result of classifying one character entry, including retry and timing bookkeeping.
+
+    `wait_seconds` covers token-bucket waits and backoff sleeps, `latency_seconds` the
+    request that succeeded and `failed_request_seconds` requests rejected with a 429.
+    Characters classified together in one batched request share these values and `unit`.
+    """
+    entry: Dict
+    result: Optional[SideCharacterClassification] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    rate_limited: int = 0
+    wait_seconds: float = 0.0
+    batch_size: int = 1
+    cached: bool = False
+    source: str = "llm"
+    unit: int = 0
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    latency_seconds: float = 0.0
+    failed_request_seconds: float = 0.0
+    prompt_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+
+class ClassificationEngine:
+    """
+    Classifies character entries concurrently with bounded parallelism and rate limiting.
+
+    Up to `max_in_flight` requests run at once on a thread pool, every request first takes
+    a token from a requests-per-minute bucket, and 429 responses are retried with jittered
+    exponential backoff. With `batch_size > 1`, consecutive characters whose dialogue is at
+    most `max_batch_dialog_chars` long are packed into one batched request; a malformed batch
+    response falls back to single-character calls. If a `cache` is given, it is passed to the
+    classify functions, and cache hits neither consume rate-limit tokens nor count as requests.
+    If a `cascade` is given, characters it labels confidently are answered locally without
+    any request (their outcomes have `source == "local"`). Outcomes are yielded in input order so output files stay ordered and resumable.
+
+    Custom `classify_fn` / `batch_classify_fn` must accept the same `cache`, `before_request`
+    and `after_response` keyword arguments as classify_character, plus any `classify_kwargs`
+    (e.g. `token_budget`), which are forwarded on every call.
+    """
+
+    def __init__(self, client, max_in_flight: int = 4, requests_per_minute: Optional[float] = None,
+                 max_retries: int = 5, backoff_base: float = 2.0, backoff_cap: float = 60.0,
+                 batch_size: int = 1, max_batch_dialog_chars: int = 2000,
+                 classify_fn: Callable = classify_character, batch_classify_fn: Callable = classify_characters_batch,
+                 cache: Optional[ClassificationCache] = None, classify_kwargs: Optional[Dict] = None,
+                 cascade: Optional[LocalCascade] = None, seed: Optional[int] = None):
+        self.client = client
+        self.cache = cache
+        self.cascade = cascade
+        self.classify_kwargs = classify_kwargs or {}
+        self.max_in_flight = max_in_flight
+        self.bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.batch_size = batch_size
+        self.max_batch_dialog_chars = max_batch_dialog_chars
+        self.classify_fn = classify_fn
+        self.batch_classify_fn = batch_classify_fn
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+
+    def _jittered_delay(self, attempt: int) -> float:
+        with self.rng_lock:
+            return backoff_delay(attempt, self.backoff_base, self.backoff_cap, self.rng)
+
+    def _call_with_retries(self, call: Callable, outcome: ClassificationOutcome):
+        """
+        Runs `call(cache=..., before_request=..., after_response=..., **classify_kwargs)`, retrying
+        rate-limit errors, and records bookkeeping on `outcome`.
+
+        Returns the call's result, or None if it failed; other exceptions are not retried
+        and are stored in `outcome.error`, except ValueError, which is re-raised so that
+        callers can react to malformed responses.
+        """
+        requested = False
+        request_started = None
+
+        def before_request():
+            nonlocal requested, request_started
+            requested = True
+            if self.bucket:
+                outcome.wait_seconds += self.bucket.acquire()
+            request_started = time.perf_counter()
+
+        def after_response(response):
+            usage = getattr(response, "usage_metadata", None)
+            if usage is not None:
+                outcome.prompt_tokens = getattr(usage, "prompt_token_count", None)
+                outcome.output_tokens = getattr(usage, "candidates_token_count", None)
+
+        while outcome.attempts < self.max_retries:
+            outcome.attempts += 1
+            request_started = None
+            try:
+                value = call(cache=self.cache, before_request=before_request, after_response=after_response,
+                             **self.classify_kwargs)
+                if request_started is not None:
+                    outcome.latency_seconds = time.perf_counter() - request_started
+                outcome.error = None
+                outcome.cached = not requested
+                return value
+            except ValueError:
+                raise
+            except Exception as e:
+                outcome.error = str(e)
+                if not is_rate_limit_error(e):
+                    return None
+                outcome.rate_limited += 1
+                if request_started is not None:
+                    outcome.failed_request_seconds += time.perf_counter() - request_started
+                if outcome.attempts < self.max_retries:
+                    delay = self._jittered_delay(outcome.attempts - 1)
+                    time.sleep(delay)
+                    outcome.wait_seconds += delay
+        return None
+
+    def classify_one(self, entry: Dict) -> ClassificationOutcome:
+        """Classifies a single entry, retrying rate-limit errors up to `max_retries` times."""
+        outcome = ClassificationOutcome(entry=entry, started_at=time.time())
+        try:
+            outcome.result = self._call_with_retries(
+                lambda **kwargs: self.classify_fn(self.client, entry, **kwargs), outcome)
+        except ValueError as e:
+            outcome.error = str(e)
+        outcome.finished_at = time.time()
+        return outcome
+
+    def classify_batch(self, entries: List[Dict]) -> List[ClassificationOutcome]:
+        """Classifies several entries with one request, falling back to single calls on malformed output."""
+        if len(entries) == 1:
+            return [self.classify_one(entries[0])]
+
+        shared = ClassificationOutcome(entry={}, batch_size=len(entries), started_at=time.time())
+        try:
+            results = self._call_with_retries(
+                lambda **kwargs: self.batch_classify_fn(self.client, entries, **kwargs), shared)
+        except ValueError:
+            # Malformed batch output: classify each character on its own instead
+            return [self.classify_one(entry) for entry in entries]
+
+        finished_at = time.time()
+        return [
+            ClassificationOutcome(
+                entry=entry, result=results[i] if results else None, error=shared.error,
+                attempts=shared.attempts, rate_limited=shared.rate_limited,
+                wait_seconds=shared.wait_seconds, batch_size=len(entries), cached=shared.cached,
+                started_at=shared.started_at, finished_at=finished_at, latency_seconds=shared.latency_seconds,
+                failed_request_seconds=shared.failed_request_seconds, prompt_tokens=shared.prompt_tokens,
+                output_tokens=shared.output_tokens,
+            )
+            for i, entry in enumerate(entries)
+        ]
+
+    def _is_batchable(self, entry: Dict) -> bool:
+        dialog_text = build_dialog_text(entry, self.classify_kwargs.get("token_budget"))
+        return len(dialog_text) <= self.max_batch_dialog_chars
+
+    def pack(self, entries: Iterable[Dict]) -> Iterator[Union[List[Dict], ClassificationOutcome]]:
+        """
+        Groups entries into units of work without reordering them.
+
+        Consecutive small entries are packed up to `batch_size`; any other entry is a unit
+        on its own and flushes the batch collected so far. Entries the cascade labels
+        locally are yielded as finished ClassificationOutcome objects in their place.
+        """
+        batch = []
+        for entry in entries:
+            local_result = self.cascade.classify(entry) if self.cascade else None
+            if local_result is not None:
+                if batch:
+                    yield batch
+                    batch = []
+                now = time.time()
+                yield ClassificationOutcome(entry=entry, result=local_result, source="local",
+                                            started_at=now, finished_at=now)
+                continue
+            if self.batch_size > 1 and self._is_batchable(entry):
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+                continue
+            if batch:
+                yield batch
+                batch = []
+            yield [entry]
+        if batch:
+            yield batch
+
+    def run(self, entries: Iterable[Dict]) -> Iterator[ClassificationOutcome]:
+        """
+        Classifies `entries` (which may be a lazy iterator) and yields outcomes in input order.
+
+        At most `2 * max_in_flight` units of work are pending at once, which keeps the
+        workers busy while a slow request at the head of the queue is still running.
+        """
+        window = 2 * self.max_in_flight
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            for unit_index, unit in enumerate(self.pack(entries)):
+                if isinstance(unit, ClassificationOutcome):
+                    future = Future()
+                    future.set_result([unit])
+                else:
+                    future = executor.submit(self.classify_batch, unit)
+                pending.append((unit_index, future))
+                if len(pending) >= window:
+                    yield from self._collect(*pending.popleft())
+            while pending:
+                yield from self._collect(*pending.popleft())
+
+    @staticmethod
+    def _collect(unit_index: int, future: Future) -> List[ClassificationOutcome]:
+        """Waits for a unit of work and tags its outcomes with the unit's index."""
+        outcomes = future.result()
+        for outcome in outcomes:
+            outcome.unit = unit_index
+        return outcomes
@@ -0,0 +1,93 @@
+# src/side_character_app/classification/fake_client.py
+
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import Optional
+
+from .schemas import SideCharacterClassification, SideCharacterBatchClassification, IndexedSideCharacterClassification
+
+LABELS = ["Comedic Relief", "Wise Mentor", "Skeptical Realist", "Loyal Sidekick"]
+
+class FakeModels:
+    """Stands in for `client.models`, answering generate_content without network access."""
+
+    def __init__(self, client: "FakeGenaiClient"):
+        self.client = client
+
+    def generate_content(self, model: str, contents: str, config: dict):
+        return self.client.generate(model, contents, config)
+
+class FakeGenaiClient:
+    """
+    A local stand-in for genai.Client used to exercise the classification pipeline offline.
+
+    Each call sleeps for a random latency and may fail with a 429 RESOURCE_EXHAUSTED error,
+    either at random (`rate_limit_probability`) or because more than `quota_per_minute` calls
+    arrived within the last 60 seconds. Labels are derived from a hash of the prompt (or of
+    each character's section of a batched prompt), so the same input always gets the same
+    answer. Batched responses are malformed with probability `malformed_probability`. Responses
+    carry an approximate `usage_metadata` like the real client's.
+    """
+
+    def __init__(self, latency_range: tuple = (0.2, 1.5), rate_limit_probability: float = 0.05,
+                 quota_per_minute: Optional[int] = None, malformed_probability: float = 0.0,
+                 seed: Optional[int] = None):
+        self.latency_range = latency_range
+        self.rate_limit_probability = rate_limit_probability
+        self.malformed_probability = malformed_probability
+        self.quota_per_minute = quota_per_minute
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.recent_calls = deque()
+        self.calls = 0
+        self.rate_limited = 0
+        self.models = FakeModels(self)
+
+    def _check_quota(self) -> tuple:
+        """Records a call and returns (accepted, simulated latency); rejected calls get a 429."""
+        with self.lock:
+            now = time.monotonic()
+            self.calls += 1
+            while self.recent_calls and now - self.recent_calls[0] > 60:
+                self.recent_calls.popleft()
+            over_quota = self.quota_per_minute is not None and len(self.recent_calls) >= self.quota_per_minute
+            unlucky = self.rng.random() < self.rate_limit_probability
+            latency = self.rng.uniform(*self.latency_range)
+            if over_quota or unlucky:
+                self.rate_limited += 1
+                return False, latency
+            self.recent_calls.append(now)
+            return True, latency
+
+    def generate(self, model: str, contents: str, config: dict):
+        accepted, latency = self._check_quota()
+        time.sleep(latency)
+        if not accepted:
+            raise RuntimeError("429 RESOURCE_EXHAUSTED. Too many requests (simulated by FakeGenaiClient).")
+
+        if config.get("response_schema") is SideCharacterBatchClassification:
+            sections = re.split(r"^### Character \d+$", contents, flags=re.MULTILINE)[1:]
+            with self.lock:
+                malformed = self.rng.random() < self.malformed_probability
+            if malformed:
+                return SimpleNamespace(parsed=None, text="{}")
+            parsed = SideCharacterBatchClassification(classifications=[
+                IndexedSideCharacterClassification(character_index=i, **self._classify_text(section).model_dump())
+                for i, section in enumerate(sections, start=1)
+            ])
+        else:
+            parsed = self._classify_text(contents)
+        text = parsed.model_dump_json()
+        usage = SimpleNamespace(prompt_token_count=len(contents) // 4, candidates_token_count=len(text) // 4)
+        return SimpleNamespace(parsed=parsed, text=text, usage_metadata=usage)
+
+    @staticmethod
+    def _classify_text(text: str) -> SideCharacterClassification:
+        """Deterministically derives a label and confidence from a hash of the text."""
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return SideCharacterClassification(label=LABELS[digest[0] % len(LABELS)], confidence=1 + digest[1] % 10)
@@ -0,0 +1,226 @@
+# src/side_character_app/classification/local_model.py
+
+import random
+import re
+import zlib
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .schemas import SideCharacterClassification
+
+TOKEN_PATTERN = re.compile(r"[a-z']+")
+DEFAULT_N_FEATURES = 2 ** 18
+
+def character_text(entry: Dict) -> str:
+    """Joins all of a character's conversations into the text the local model sees."""
+    return "\n\n".join(entry["conversations"].values())
+
+def training_examples(store) -> Tuple[List[str], List[str]]:
+    """
+    Collects one (text, label) example per character from a ClassificationStore.
+
+    Only characters labeled by the API are used, so the local model never trains on its
+    own predictions.
+
+    Returns:
+        A tuple of (texts, labels) in the store's insertion order.
+    """
+    texts, labels = [], []
+    rows = store.iter_rows()
+    for _, character_rows in groupby(rows, key=lambda row: (row["character_name"], row["movie_title"])):
+        character_rows = list(character_rows)
+        if character_rows[0].get("classified_by", "llm") != "llm":
+            continue
+        texts.append("\n\n".join(row["conversation"] for row in character_rows))
+        labels.append(character_rows[0]["label"])
+    return texts, labels
+
+class HashedFeatures:
+    """
+    Stateless bag-of-words vectorizer using the hashing trick.
+
+    Word unigrams and bigrams are hashed into `n_features` columns with crc32 (stable across
+    runs, unlike hash()), weighted by log(1 + count) and L2-normalized per document. Column 0
+    is a constant bias feature, which also guarantees that no row is empty.
+    """
+
+    def __init__(self, n_features: int = DEFAULT_N_FEATURES):
+        self.n_features = n_features
+        self.columns = {}
+
+    def _column(self, term: str) -> int:
+        column = self.columns.get(term)
+        if column is None:
+            column = 1 + zlib.crc32(term.encode("utf-8")) % (self.n_features - 1)
+            self.columns[term] = column
+        return column
+
+    def transform(self, texts: Iterable[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorizes documents into a CSR-style sparse matrix.
+
+        Returns:
+            A tuple of (indptr, columns, values): row i's non-zeros are
+            columns[indptr[i]:indptr[i+1]] with the matching values.
+        """
+        indptr, all_columns, all_values = [0], [], []
+        for text in texts:
+            words = TOKEN_PATTERN.findall(text.lower())
+            counts = {}
+            for term in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                column = self._column(term)
+                counts[column] = counts.get(column, 0) + 1
+            columns = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            values = np.log1p(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+            norm = np.sqrt((values ** 2).sum()) or 1.0
+            all_columns.append(np.concatenate([[0], columns]))
+            all_values.append(np.concatenate([[1.0], values / norm]))
+            indptr.append(indptr[-1] + len(columns) + 1)
+        if not all_columns:
+            return np.array(indptr), np.empty(0, dtype=np.int64), np.empty(0)
+        return np.array(indptr), np.concatenate(all_columns), np.concatenate(all_values)
+
+class HashedLinearClassifier:
+    """
+    Multinomial logistic regression over hashed n-gram features, implemented in NumPy.
+
+    Trained with full-batch Adam and L2 regularization. Small enough to train on every run
+    from the already-labeled characters; predictions come with the margin between the two
+    most likely labels, which the cascade uses to decide whether to trust them.
+    """
+
+    def __init__(self, n_features: int = DEFAULT_N_FEATURES, l2: float = 5e-4, epochs: int = 150,
+                 learning_rate: float = 0.05):
+        self.features = HashedFeatures(n_features)
+        self.l2 = l2
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.labels: List[str] = []
+        self.weights: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _scores(matrix: tuple, weights: np.ndarray) -> np.ndarray:
+        indptr, columns, values = matrix
+        return np.add.reduceat(weights[columns] * values[:, None], indptr[:-1], axis=0)
+
+    @staticmethod
+    def _softmax(scores: np.ndarray) -> np.ndarray:
+        scores = scores - scores.max(axis=1, keepdims=True)
+        exp = np.exp(scores)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def fit(self, texts: List[str], labels: List[str]) -> "HashedLinearClassifier":
+        """Trains the model on documents and their labels."""
+        self.labels = sorted(set(labels))
+        label_index = {label: i for i, label in enumerate(self.labels)}
+        targets = np.zeros((len(labels), len(self.labels)))
+        targets[np.arange(len(labels)), [label_index[label] for label in labels]] = 1.0
+
+        matrix = self.features.transform(texts)
+        indptr, columns, values = matrix
+        rows = np.repeat(np.arange(len(texts)), np.diff(indptr))
+        # Only columns that occur in the training data can receive gradient
+        used, local_columns = np.unique(columns, return_inverse=True)
+        local_matrix = (indptr, local_columns, values)
+
+        weights = np.zeros((len(used), len(self.labels)))
+        first_moment = np.zeros_like(weights)
+        second_moment = np.zeros_like(weights)
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        for step in range(1, self.epochs + 1):
+            errors = (self._softmax(self._scores(local_matrix, weights)) - targets) / len(texts)
+            gradient = np.stack([
+                np.bincount(local_columns, weights=values * errors[rows, k], minlength=len(used))
+                for k in range(len(self.labels))
+            ], axis=1) + self.l2 * weights
+            first_moment = beta1 * first_moment + (1 - beta1) * gradient
+            second_moment = beta2 * second_moment + (1 - beta2) * gradient ** 2
+            corrected = first_moment / (1 - beta1 ** step)
+            weights -= self.learning_rate * corrected / (np.sqrt(second_moment / (1 - beta2 ** step)) + eps)
+
+        self.weights = np.zeros((self.features.n_features, len(self.labels)))
+        self.weights[used] = weights
+        return self
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """Returns an array of label probabilities, one row per text, columns in `self.labels` order."""
+        return self._softmax(self._scores(self.features.transform(texts), self.weights))
+
+    def predict(self, texts: List[str]) -> List[Tuple[str, float, float]]:
+        """Returns (label, probability, margin over the runner-up label) for each text."""
+        probabilities = self.predict_proba(texts)
+        top_two = np.sort(probabilities, axis=1)[:, -2:]
+        best = probabilities.argmax(axis=1)
+        return [
+            (self.labels[best[i]], float(top_two[i, 1]), float(top_two[i, 1] - top_two[i, 0]))
+            for i in range(len(texts))
+        ]
+
+def evaluate_thresholds(model: HashedLinearClassifier, texts: List[str], labels: List[str],
+                        thresholds: Iterable[float]) -> List[Dict]:
+    """
+    Measures, on labeled held-out data, what each margin threshold would do.
+
+    Treating the API labels as ground truth, "coverage" is the share of characters the local
+    model would label, "agreement" its accuracy on those, and "accuracy_change" the resulting
+    change in overall accuracy compared to sending every character to the API.
+    """
+    predictions = model.predict(texts)
+    report = []
+    for threshold in thresholds:
+        accepted = [(label, truth) for (label, _, margin), truth in zip(predictions, labels) if margin >= threshold]
+        correct = sum(label == truth for label, truth in accepted)
+        report.append({
+            "threshold": threshold,
+            "coverage": len(accepted) / len(texts) if texts else 0.0,
+            "agreement": correct / len(accepted) if accepted else 1.0,
+            "accuracy_change": -(len(accepted) - correct) / len(texts) if texts else 0.0,
+        })
+    return report
+
+class LocalCascade:
+    """
+    A cheap first stage in front of the API classifier.
+
+    Characters whose local prediction beats the runner-up label by at least `threshold`
+    (in probability) are labeled locally; all others go on to the API. The reported
+    confidence is the model's probability for the label, scaled to 1-10.
+    """
+
+    def __init__(self, model: HashedLinearClassifier, threshold: float):
+        self.model = model
+        self.threshold = threshold
+
+    @classmethod
+    def train(cls, texts: List[str], labels: List[str], threshold: float, holdout: float = 0.2,
+              seed: int = 0, **model_kwargs) -> Tuple["LocalCascade", List[Dict]]:
+        """
+        Trains a cascade on API-labeled characters.
+
+        A `holdout` share of the examples is first used to estimate coverage and accuracy at
+        a range of thresholds (including `threshold`); the final model is then trained on all
+        examples.
+
+        Returns:
+            A tuple of (cascade, threshold report from evaluate_thresholds).
+        """
+        order = list(range(len(texts)))
+        random.Random(seed).shuffle(order)
+        split = int(len(order) * (1 - holdout))
+        train, test = order[:split], order[split:]
+        thresholds = sorted({0.2, 0.4, 0.6, 0.8, threshold})
+
+        report = []
+        if test and len({labels[i] for i in train}) > 1:
+            probe = HashedLinearClassifier(**model_kwargs).fit([texts[i] for i in train], [labels[i] for i in train])
+            report = evaluate_thresholds(probe, [texts[i] for i in test], [labels[i] for i in test], thresholds)
+        return cls(HashedLinearClassifier(**model_kwargs).fit(texts, labels), threshold), report
+
+    def classify(self, entry: Dict) -> Optional[SideCharacterClassification]:
+        """Returns a local classification for a confident prediction, or None to defer to the API."""
+        label, probability, margin = self.model.predict([character_text(entry)])[0]
+        if margin < self.threshold:
+            return None
+        return SideCharacterClassification(label=label, confidence=min(10, max(1, round(probability * 10))))
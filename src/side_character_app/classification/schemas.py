@@ -1,7 +1,7 @@
 # src/side_character_app/classification/schemas.py
 
 from pydantic import BaseModel, Field
-from typing import Literal
+from typing import List, Literal
 
 class SideCharacterClassification(BaseModel):
     """
@@ -18,4 +18,22 @@ class SideCharacterClassification(BaseModel):
         description="A score from 1 (very unsure) to 10 (very confident) on the classification.",
         ge=1, # ge = greater than or equal to
         le=10  # le = less than or equal to
-    )
\ No newline at end of file
+    )
+
+class IndexedSideCharacterClassification(SideCharacterClassification):
+    """
+    A classification for one character of a batched request, identified by its position.
+    """
+    character_index: int = Field(
+        description="The number of the character this classification belongs to, as given in the prompt (starting at 1).",
+        ge=1
+    )
+
+
+class SideCharacterBatchClassification(BaseModel):
+    """
+    Pydantic schema for a batched classification request covering several characters.
+    """
+    classifications: List[IndexedSideCharacterClassification] = Field(
+        description="Exactly one classification per character in the prompt."
+    )
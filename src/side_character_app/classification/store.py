@@ -0,0 +1,199 @@
+# src/side_character_app/classification/store.py
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List
+
+CONFIDENCE_THRESHOLDS = range(5, 11)
+
+class ClassificationStore:
+    """
+    Indexed SQLite (WAL) store of classification results.
+
+    Characters are keyed on (character_name, movie_title), so "already classified?" checks
+    are index lookups rather than a scan of the output file. Per-label character and
+    conversation counts and the confidence buckets are maintained incrementally in an
+    aggregates table, and the labeled conversations can be streamed out as JSON or JSONL.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS characters (
+                character_name TEXT NOT NULL,
+                movie_title TEXT NOT NULL,
+                label TEXT NOT NULL,
+                confidence INTEGER,
+                classified_at REAL NOT NULL,
+                PRIMARY KEY (character_name, movie_title)
+            );
+            CREATE TABLE IF NOT EXISTS conversations (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                character_name TEXT NOT NULL,
+                movie_title TEXT NOT NULL,
+                genre TEXT NOT NULL,
+                conversation_id TEXT NOT NULL,
+                conversation TEXT NOT NULL,
+                label TEXT NOT NULL,
+                confidence INTEGER,
+                in_prompt INTEGER,
+                classified_by TEXT
+            );
+            CREATE TABLE IF NOT EXISTS aggregates (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (kind, key)
+            );
+        """)
+        # Stores created before classified_by was tracked
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(conversations)")}
+        if "classified_by" not in columns:
+            self.conn.execute("ALTER TABLE conversations ADD COLUMN classified_by TEXT")
+        self.conn.commit()
+
+    def __contains__(self, character_id: tuple) -> bool:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM characters WHERE character_name = ? AND movie_title = ?", character_id
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        """Number of classified characters, read from the maintained aggregates."""
+        return sum(self.summary()["characters_per_label"].values())
+
+    def _increment(self, kind: str, key: str, amount: int):
+        self.conn.execute(
+            "INSERT INTO aggregates (kind, key, count) VALUES (?, ?, ?) "
+            "ON CONFLICT (kind, key) DO UPDATE SET count = count + excluded.count",
+            (kind, key, amount),
+        )
+
+    def _add_rows(self, character_name: str, movie_title: str, rows: List[Dict]):
+        """Inserts one character's conversation rows and updates the aggregates (no commit)."""
+        label, confidence = rows[0]["label"], rows[0].get("confidence")
+        inserted = self.conn.execute(
+            "INSERT OR IGNORE INTO characters (character_name, movie_title, label, confidence, classified_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (character_name, movie_title, label, confidence, time.time()),
+        ).rowcount
+        if not inserted:
+            return False
+
+        self.conn.executemany(
+            "INSERT INTO conversations (character_name, movie_title, genre, conversation_id, conversation, "
+            "label, confidence, in_prompt, classified_by) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(
+                character_name, movie_title, json.dumps(row.get("genre", [])), row["conversation_id"],
+                row["conversation"], row["label"], row.get("confidence"),
+                None if "in_prompt" not in row else int(row["in_prompt"]), row.get("classified_by"),
+            ) for row in rows],
+        )
+        self._increment("characters_per_label", label, 1)
+        for row in rows:
+            self._increment("conversations_per_label", row["label"], 1)
+        if isinstance(confidence, (int, float)):
+            for threshold in CONFIDENCE_THRESHOLDS:
+                if confidence >= threshold:
+                    self._increment("confidence_buckets", f"{threshold}+", 1)
+        return True
+
+    def add_character(self, character_name: str, movie_title: str, rows: List[Dict]) -> bool:
+        """
+        Atomically records a classified character and its labeled conversation rows.
+
+        Returns False (and changes nothing) if the character was already stored.
+        """
+        with self.lock:
+            with self.conn:
+                return self._add_rows(character_name, movie_title, rows)
+
+    def import_jsonl(self, jsonl_path: str) -> int:
+        """
+        One-time migration of an existing labeled-conversations JSONL file into the store.
+
+        Rows are grouped per character in file order; malformed lines are skipped.
+        Returns the number of characters imported.
+        """
+        grouped = {}
+        with open(jsonl_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                    grouped.setdefault((data["character_name"], data["movie_title"]), []).append(data)
+                except (json.JSONDecodeError, KeyError):
+                    continue
+        imported = 0
+        with self.lock:
+            with self.conn:
+                for (character_name, movie_title), rows in grouped.items():
+                    try:
+                        imported += self._add_rows(character_name, movie_title, rows)
+                    except KeyError:
+                        continue
+        return imported
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Returns the maintained per-label and confidence-bucket counts."""
+        summary = {"characters_per_label": {}, "conversations_per_label": {}, "confidence_buckets": {}}
+        with self.lock:
+            for kind, key, count in self.conn.execute("SELECT kind, key, count FROM aggregates"):
+                summary.setdefault(kind, {})[key] = count
+        return summary
+
+    def iter_rows(self) -> Iterator[Dict]:
+        """Streams the labeled conversation rows in insertion order."""
+        # A separate read connection lets WAL readers stream while the writer keeps going
+        reader = sqlite3.connect(self.path)
+        try:
+            cursor = reader.execute(
+                "SELECT character_name, movie_title, genre, conversation_id, conversation, label, confidence, in_prompt, "
+                "classified_by FROM conversations ORDER BY seq"
+            )
+            for character_name, movie_title, genre, conv_id, conversation, label, confidence, in_prompt, classified_by in cursor:
+                row = {
+                    "character_name": character_name, "movie_title": movie_title, "genre": json.loads(genre),
+                    "conversation_id": conv_id, "conversation": conversation, "label": label, "confidence": confidence,
+                }
+                if in_prompt is not None:
+                    row["in_prompt"] = bool(in_prompt)
+                if classified_by is not None:
+                    row["classified_by"] = classified_by
+                yield row
+        finally:
+            reader.close()
+
+    def export_jsonl(self, path: str) -> int:
+        """Writes all rows as JSONL without loading them into memory. Returns the row count."""
+        count = 0
+        with open(path, "w", encoding="utf-8") as f:
+            for row in self.iter_rows():
+                f.write(json.dumps(row) + "\n")
+                count += 1
+        return count
+
+    def export_json(self, path: str) -> int:
+        """
+        Writes all rows as an indented JSON array, streamed row by row.
+
+        The output is identical to json.dump(rows, f, indent=2). Returns the row count.
+        """
+        count = 0
+        with open(path, "w", encoding="utf-8") as f:
+            for row in self.iter_rows():
+                f.write("[\n" if count == 0 else ",\n")
+                f.write("\n".join("  " + line for line in json.dumps(row, indent=2).split("\n")))
+                count += 1
+            f.write("\n]" if count else "[]")
+        return count
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,197 @@
+# src/side_character_app/classification/telemetry.py
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .engine import ClassificationOutcome
+
+class TelemetryWriter:
+    """
+    Appends structured classification events to a JSONL metrics file.
+
+    Each run is a session: a `session_start` event records the run configuration, then
+    one `character` event is written per classified (or failed) character, and a
+    `session_end` event closes the session. Events are flushed as they are written, so
+    an interrupted run still leaves usable metrics behind.
+    """
+
+    def __init__(self, path: str, config: Dict):
+        self.path = path
+        self.session = time.strftime("%Y%m%dT%H%M%S") + f"-{os.getpid()}"
+        self.lock = threading.Lock()
+        self.file = open(path, "a", encoding="utf-8")
+        self.write({"event": "session_start", "config": config})
+
+    def write(self, event: Dict):
+        event = {"session": self.session, "time": time.time(), **event}
+        with self.lock:
+            self.file.write(json.dumps(event) + "\n")
+            self.file.flush()
+
+    def record(self, outcome: ClassificationOutcome, prompt_chars: int, prompt_tokens_est: int):
+        """Writes the event for one character's outcome."""
+        entry = outcome.entry
+        self.write({
+            "event": "character",
+            "character_name": entry["side_character_name"],
+            "movie_title": entry["movie_title"],
+            "outcome": "success" if outcome.result is not None else "error",
+            "source": outcome.source,
+            "cached": outcome.cached,
+            "unit": outcome.unit,
+            "batch_size": outcome.batch_size,
+            "attempts": outcome.attempts,
+            "retries": max(0, outcome.attempts - 1),
+            "rate_limited": outcome.rate_limited,
+            "wait_seconds": round(outcome.wait_seconds, 4),
+            "latency_seconds": round(outcome.latency_seconds, 4),
+            "failed_request_seconds": round(outcome.failed_request_seconds, 4),
+            "started_at": outcome.started_at,
+            "finished_at": outcome.finished_at,
+            "prompt_chars": prompt_chars,
+            "prompt_tokens_est": prompt_tokens_est,
+            "prompt_tokens": outcome.prompt_tokens,
+            "output_tokens": outcome.output_tokens,
+            "error": outcome.error if outcome.result is None else None,
+        })
+
+    def close(self):
+        self.write({"event": "session_end"})
+        with self.lock:
+            self.file.close()
+
+def load_events(path: str, session: Optional[str] = None, all_sessions: bool = False) -> List[Dict]:
+    """
+    Reads events from a metrics file.
+
+    By default only the most recent session is returned; pass `session` to select a
+    specific one or `all_sessions=True` to get everything.
+    """
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    if all_sessions:
+        return events
+    if session is None:
+        sessions = [event["session"] for event in events if event.get("event") == "session_start"]
+        if not sessions:
+            return []
+        session = sessions[-1]
+    return [event for event in events if event.get("session") == session]
+
+def percentiles(values: List[float], quantiles=(50, 95, 99)) -> Dict[str, Optional[float]]:
+    """Returns {"p50": ..., ...} for `values`, with None when there are no values."""
+    if not values:
+        return {f"p{q}": None for q in quantiles}
+    return {f"p{q}": float(np.percentile(values, q)) for q in quantiles}
+
+def _request_key(event: Dict) -> tuple:
+    # Characters classified in one batched request share a unit; everything else is its own request
+    if event["batch_size"] > 1:
+        return event["session"], event["unit"]
+    return event["session"], event["unit"], event["character_name"], event["movie_title"]
+
+def summarize(events: List[Dict]) -> Dict:
+    """
+    Aggregates character events into throughput, latency and rate-limiting figures.
+
+    A "request" is one API call that was actually made (cache hits and locally labeled
+    characters are excluded); characters of a batched request count as one request.
+    """
+    characters = [event for event in events if event.get("event") == "character"]
+    starts = [event for event in events if event.get("event") == "session_start"]
+    summary = {
+        "sessions": [event["session"] for event in starts],
+        "config": starts[-1]["config"] if starts else {},
+        "characters": len(characters),
+        "succeeded": sum(event["outcome"] == "success" for event in characters),
+        "failed": sum(event["outcome"] == "error" for event in characters),
+        "local": sum(event["source"] == "local" for event in characters),
+        "cached": sum(event["cached"] and event["source"] != "local" for event in characters),
+    }
+    if not characters:
+        return summary
+
+    requests = {}
+    for event in characters:
+        if event["source"] == "llm" and not event["cached"] and event["attempts"] > 0:
+            requests.setdefault(_request_key(event), event)
+    requests = list(requests.values())
+    successful = [event for event in requests if event["outcome"] == "success"]
+
+    # Wall time is summed per session so idle gaps between runs do not dilute throughput
+    spans = {}
+    for event in starts:
+        spans[event["session"]] = [event["time"], event["time"]]
+    for event in characters:
+        span = spans.setdefault(event["session"], [event["started_at"], event["finished_at"]])
+        span[0] = min(span[0], event["started_at"])
+        span[1] = max(span[1], event["finished_at"])
+    wall_seconds = max(sum(end - start for start, end in spans.values()), 1e-9)
+    rate_limit_seconds = sum(event["wait_seconds"] + event["failed_request_seconds"] for event in requests)
+    busy_seconds = sum(event["latency_seconds"] for event in requests) + rate_limit_seconds
+
+    summary.update({
+        "wall_seconds": wall_seconds,
+        "requests": len(requests),
+        "characters_per_minute": 60 * len(characters) / wall_seconds,
+        "requests_per_minute": 60 * len(requests) / wall_seconds,
+        "latency_seconds": percentiles([event["latency_seconds"] for event in successful]),
+        "retries": sum(event["retries"] for event in requests),
+        "rate_limited": sum(event["rate_limited"] for event in requests),
+        "rate_limit_seconds": rate_limit_seconds,
+        "rate_limit_share": rate_limit_seconds / busy_seconds if busy_seconds else 0.0,
+        "prompt_tokens_est": sum(
+            event["prompt_tokens_est"] for event in characters if event["source"] == "llm" and not event["cached"]),
+        "prompt_tokens": sum(event["prompt_tokens"] or 0 for event in requests),
+        "output_tokens": sum(event["output_tokens"] or 0 for event in requests),
+        "by_batch_size": {
+            size: {
+                "requests": len(group),
+                "latency_seconds": percentiles([event["latency_seconds"] for event in group if event["outcome"] == "success"]),
+            }
+            for size in sorted({event["batch_size"] for event in requests})
+            for group in [[event for event in requests if event["batch_size"] == size]]
+        },
+    })
+    return summary
+
+def format_report(summary: Dict) -> str:
+    """Renders a summary from `summarize` as a plain-text report."""
+    def seconds(value):
+        return "n/a" if value is None else f"{value:.2f}s"
+
+    lines = [f"Sessions: {', '.join(summary['sessions']) or 'n/a'}"]
+    if summary["config"]:
+        lines.append("Config: " + ", ".join(f"{key}={value}" for key, value in summary["config"].items()))
+    lines.append(f"Characters: {summary['characters']} ({summary['succeeded']} succeeded, {summary['failed']} failed, "
+                 f"{summary['cached']} from cache, {summary['local']} labeled locally)")
+    if not summary["characters"]:
+        return "\n".join(lines)
+
+    latency = summary["latency_seconds"]
+    lines += [
+        f"Wall time: {summary['wall_seconds']:.1f}s",
+        f"Throughput: {summary['characters_per_minute']:.1f} characters/min, "
+        f"{summary['requests_per_minute']:.1f} API requests/min ({summary['requests']} requests)",
+        f"Request latency: p50 {seconds(latency['p50'])}, p95 {seconds(latency['p95'])}, p99 {seconds(latency['p99'])}",
+        f"Retries: {summary['retries']} ({summary['rate_limited']} rate-limited responses)",
+        f"Time lost to rate limiting: {summary['rate_limit_seconds']:.1f}s "
+        f"({summary['rate_limit_share']:.0%} of request time; token-bucket waits, backoff and 429 responses)",
+        f"Prompt tokens: ~{summary['prompt_tokens_est']} estimated"
+        + (f", {summary['prompt_tokens']} reported (+{summary['output_tokens']} output)" if summary["prompt_tokens"] else ""),
+        "By batch size:",
+    ]
+    for size, group in summary["by_batch_size"].items():
+        lines.append(f"  {size}: {group['requests']} requests, p50 {seconds(group['latency_seconds']['p50'])}, "
+                     f"p95 {seconds(group['latency_seconds']['p95'])}")
+    return "\n".join(lines)
@@ -1,11 +1,110 @@
 # src/chosen_app/data_processing/builder.py
 
+import numpy as np
 import pandas as pd
 import re
+from typing import Iterator
+from .line_store import LineStore
+
+LINE_ID_PATTERN = r"L\d+"
 
 def parse_line_ids(raw_text: str) -> list:
     """Extracts a list of line IDs (e.g., 'L1045') from the raw string."""
-    return re.findall(r"L\d+", raw_text)
+    return re.findall(LINE_ID_PATTERN, raw_text)
+
+def _last_value_map(df: pd.DataFrame, key: str, value: str) -> pd.Series:
+    """Returns a key -> value Series where the last duplicate key wins, like dict(zip(...))."""
+    deduped = df.drop_duplicates(subset=key, keep="last")
+    return pd.Series(deduped[value].to_numpy(), index=deduped[key].to_numpy())
+
+def select_main_side_conversations(dataframes: dict) -> pd.DataFrame:
+    """
+    Filters the conversations down to main/side character pairs in movies with metadata.
+
+    Returns a DataFrame (indexed and ordered like the conversations DataFrame) with the side
+    character's ID and name, the movie title and genres, and the raw utterance IDs of each
+    conversation.
+    """
+    titles_df = dataframes["titles"]
+    characters_df = dataframes["characters"]
+    convs = dataframes["conversations"]
+
+    credit_pos = _last_value_map(characters_df, "characterID", "credit_pos")
+    char_names = _last_value_map(characters_df, "characterID", "character_name")
+    movie_titles = _last_value_map(titles_df, "movieID", "movie_title")
+    movie_genres = _last_value_map(titles_df, "movieID", "genres")
+
+    # --- Identify main and side characters based on credit position ---
+    pos1 = convs["char1ID"].map(credit_pos)
+    pos2 = convs["char2ID"].map(credit_pos)
+    is_main1, is_side1 = pos1.isin([1, 2, 3]), pos1 >= 4
+    is_main2, is_side2 = pos2.isin([1, 2, 3]), pos2 >= 4
+
+    # Keep only main/side pairs in movies we have metadata for
+    keep = ((is_side1 & is_main2) | (is_side2 & is_main1)) & convs["movieID"].isin(movie_titles.index)
+    convs = convs[keep]
+    side_ids = convs["char1ID"].where(is_side1[keep], convs["char2ID"])
+
+    return pd.DataFrame({
+        "side_id": side_ids,
+        "side_name": side_ids.map(char_names),
+        "movie_title": convs["movieID"].map(movie_titles),
+        "genres": convs["movieID"].map(movie_genres),
+        "utteranceIDs": convs["utteranceIDs"],
+    })
+
+def assemble_conversation_texts(utterance_ids: pd.Series, line_store: LineStore) -> pd.Series:
+    """
+    Expands raw utterance ID strings in bulk and joins each conversation's lines into text.
+
+    Returns a Series aligned to the index of `utterance_ids`; conversations with no known
+    lines or only whitespace are dropped.
+    """
+    tokens = utterance_ids.str.findall(LINE_ID_PATTERN).explode().dropna()
+    positions = line_store.positions(tokens.str[1:].astype(np.int64).to_numpy())
+    found = positions >= 0
+    texts = pd.Series(line_store.format_lines(positions[found]), index=tokens.index[found], dtype=object)
+    conv_texts = texts.groupby(level=0, sort=True).agg("\n".join).str.strip()
+    return conv_texts[conv_texts != ""]
+
+def build_conversation_rows(dataframes: dict) -> pd.DataFrame:
+    """
+    Selects main/side conversations and assembles their text.
+
+    Returns a DataFrame indexed by conversation position with side_name, movie_title,
+    genres and conversation columns. Rows can be computed per movie and concatenated,
+    since every conversation only references lines and characters of its own movie.
+    """
+    selected = select_main_side_conversations(dataframes)
+    line_store = LineStore.from_dataframe(dataframes["lines"])
+    conv_texts = assemble_conversation_texts(selected["utteranceIDs"], line_store)
+    selected = selected.loc[conv_texts.index]
+    return pd.DataFrame({
+        "side_name": selected["side_name"],
+        "movie_title": selected["movie_title"],
+        "genres": selected["genres"],
+        "conversation": conv_texts,
+    })
+
+def aggregate_personas(rows: pd.DataFrame) -> list:
+    """Groups conversation rows into one persona entry per (character, movie), in row order."""
+    entries = {}
+    for side_name, movie_name, genres, conv_text in zip(
+        rows["side_name"], rows["movie_title"], rows["genres"], rows["conversation"]
+    ):
+        existing_entry = entries.get((side_name, movie_name))
+        if existing_entry:
+            conv_key = f"conv{len(existing_entry['conversations']) + 1}"
+            existing_entry["conversations"][conv_key] = conv_text
+        else:
+            entries[(side_name, movie_name)] = {
+                "side_character_name": side_name,
+                "movie_title": movie_name,
+                "genre": genres,
+                "conversations": {"conv1": conv_text}
+            }
+
+    return list(entries.values())
 
 def build_side_character_conversations(dataframes: dict) -> list:
     """
@@ -17,56 +116,26 @@ def build_side_character_conversations(dataframes: dict) -> list:
     Returns:
         A list of dictionaries, each representing a side character's persona.
     """
-    titles_df = dataframes["titles"]
-    characters_df = dataframes["characters"]
-    lines_df = dataframes["lines"]
-    conversations_df = dataframes["conversations"]
-
-    # --- Build useful maps for efficient lookups ---
-    credit_pos_map = dict(zip(characters_df["characterID"], characters_df["credit_pos"]))
-    char_name_map = dict(zip(characters_df["characterID"], characters_df["character_name"]))
-    movie_name_map = dict(zip(titles_df["movieID"], titles_df["movie_title"]))
-    movie_genre_map = dict(zip(titles_df["movieID"], titles_df["genres"]))
-    line_map = dict(zip(lines_df["lineID"], zip(lines_df["character_name"], lines_df["text"])))
+    print("Building structured conversations...")
+    return aggregate_personas(build_conversation_rows(dataframes))
 
-    # --- Identify main and side characters based on credit position ---
-    main_chars = {cid for cid, pos in credit_pos_map.items() if pos in [1, 2, 3]}
-    side_chars = {cid for cid, pos in credit_pos_map.items() if pos >= 4}
+def iter_side_character_conversations(dataframes: dict) -> Iterator[dict]:
+    """
+    Streaming variant of build_side_character_conversations that yields personas movie by movie.
 
-    results = []
+    Movies are visited in order of their first conversation, so the output matches the list
+    version whenever the conversations file is grouped by movie (as the Cornell corpus is).
+    """
     print("Building structured conversations...")
-    for _, row in conversations_df.iterrows():
-        char1, char2, movie_id, raw_utt_ids = row["char1ID"], row["char2ID"], row["movieID"], row["utteranceIDs"]
-        utt_ids = parse_line_ids(raw_utt_ids)
-
-        # Ensure we have metadata for this movie
-        if movie_id not in movie_genre_map or movie_id not in movie_name_map:
-            continue
-
-        # Check if the conversation is between a main and a side character
-        if (char1 in side_chars and char2 in main_chars) or (char2 in side_chars and char1 in main_chars):
-            side_id = char1 if char1 in side_chars else char2
-            side_name = char_name_map.get(side_id, f"Unknown ({side_id})")
-            movie_name = movie_name_map[movie_id]
-            genres = movie_genre_map[movie_id]
-
-            conv_lines = [f"{line_map[lid][0]}: {line_map[lid][1]}" for lid in utt_ids if lid in line_map]
-            conv_text = "\n".join(conv_lines).strip()
-
-            if not conv_text:
-                continue
-
-            # Aggregate conversations for the same character in the same movie
-            existing_entry = next((e for e in results if e["side_character_name"] == side_name and e["movie_title"] == movie_name), None)
-            if existing_entry:
-                conv_key = f"conv{len(existing_entry['conversations']) + 1}"
-                existing_entry["conversations"][conv_key] = conv_text
-            else:
-                results.append({
-                    "side_character_name": side_name,
-                    "movie_title": movie_name,
-                    "genre": genres,
-                    "conversations": {"conv1": conv_text}
-                })
-
-    return results
\ No newline at end of file
+    rows = build_conversation_rows(dataframes)
+    movie_ids = dataframes["conversations"].loc[rows.index, "movieID"].astype(object).to_numpy()
+    for _, movie_rows in rows.groupby(movie_ids, sort=False):
+        yield from aggregate_personas(movie_rows)
+
+def has_valid_conversation_count(entry: dict, max_conversations: int) -> bool:
+    """True if the persona has between 1 and `max_conversations` non-empty conversations."""
+    return 1 <= len([c for c in entry["conversations"].values() if c.strip()]) <= max_conversations
+
+def filter_by_conversation_count(results: list, max_conversations: int) -> list:
+    """Keeps personas with between 1 and `max_conversations` non-empty conversations."""
+    return [r for r in results if has_valid_conversation_count(r, max_conversations)]
@@ -0,0 +1,93 @@
+# src/side_character_app/data_processing/cache.py
+
+import hashlib
+import os
+from collections.abc import Mapping
+from typing import Optional
+
+import pandas as pd
+
+from .loader import LOADER_VERSION, RAW_FILES, load_and_clean_data
+
+FRAME_NAMES = ["titles", "characters", "lines", "conversations"]
+
+def fingerprint_raw_files(data_dir: str) -> str:
+    """Hashes the contents of the raw corpus files together with the loader version."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"loader-v{LOADER_VERSION}".encode())
+    for filename in RAW_FILES:
+        digest.update(filename.encode())
+        path = os.path.join(data_dir, filename)
+        if not os.path.exists(path):
+            digest.update(b"<missing>")
+            continue
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+class CachedCorpus(Mapping):
+    """A read-only mapping of cached DataFrames that unpickles each frame on first access."""
+
+    def __init__(self, cache_path: str):
+        self.cache_path = cache_path
+        self._frames = {}
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        if name not in FRAME_NAMES:
+            raise KeyError(name)
+        if name not in self._frames:
+            self._frames[name] = pd.read_pickle(os.path.join(self.cache_path, f"{name}.pkl"))
+        return self._frames[name]
+
+    def __iter__(self):
+        return iter(FRAME_NAMES)
+
+    def __len__(self) -> int:
+        return len(FRAME_NAMES)
+
+def _remove_stale_entries(cache_dir: str, keep: str):
+    """Deletes cache entries for older fingerprints."""
+    for entry in os.listdir(cache_dir):
+        entry_path = os.path.join(cache_dir, entry)
+        if entry == keep or not entry.startswith("corpus_") or not os.path.isdir(entry_path):
+            continue
+        for filename in os.listdir(entry_path):
+            os.remove(os.path.join(entry_path, filename))
+        os.rmdir(entry_path)
+
+def load_cached_data(data_dir: str, cache_dir: str, chunk_size: Optional[int] = None, memory_budget_mb: Optional[float] = None) -> Mapping:
+    """
+    Returns the cleaned corpus DataFrames, re-parsing the raw files only when they changed.
+
+    The cache entry is keyed on a fingerprint of the raw files and LOADER_VERSION, so edits
+    to the data or to the cleaning logic invalidate it automatically.
+
+    Args:
+        data_dir: The path to the directory containing the raw .tsv files.
+        cache_dir: Directory holding the binary cache entries.
+        chunk_size: Passed to load_and_clean_data on a cache miss.
+        memory_budget_mb: Passed to load_and_clean_data on a cache miss.
+
+    Returns:
+        A mapping with the same keys as load_and_clean_data's result.
+    """
+    fingerprint = fingerprint_raw_files(data_dir)
+    entry_name = f"corpus_{fingerprint}"
+    cache_path = os.path.join(cache_dir, entry_name)
+
+    if os.path.exists(os.path.join(cache_path, "COMPLETE")):
+        print(f"Loaded cached corpus ({fingerprint}).")
+        return CachedCorpus(cache_path)
+
+    dataframes = load_and_clean_data(data_dir, chunk_size=chunk_size, memory_budget_mb=memory_budget_mb)
+
+    os.makedirs(cache_path, exist_ok=True)
+    for name in FRAME_NAMES:
+        dataframes[name].to_pickle(os.path.join(cache_path, f"{name}.pkl"))
+    # Written last so that an interrupted write is never mistaken for a valid entry
+    open(os.path.join(cache_path, "COMPLETE"), "w").close()
+    _remove_stale_entries(cache_dir, keep=entry_name)
+    print(f"Cached parsed corpus ({fingerprint}).")
+
+    return dataframes
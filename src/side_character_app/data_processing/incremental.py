@@ -0,0 +1,135 @@
+# src/side_character_app/data_processing/incremental.py
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from .builder import build_conversation_rows, aggregate_personas, filter_by_conversation_count
+from .loader import LOADER_VERSION
+
+STATE_VERSION = 1
+FRAME_NAMES = ["titles", "characters", "lines", "conversations"]
+
+def movie_fingerprints(dataframes: dict) -> dict:
+    """
+    Hashes every movie's rows across all four DataFrames.
+
+    Rows are hashed in bulk with pandas and combined per movie in file order, so any edit,
+    addition, removal or reordering of a movie's raw rows changes its fingerprint.
+    """
+    digests = {}
+    for name in FRAME_NAMES:
+        df = dataframes[name]
+        if "genres" in df.columns:
+            df = df.assign(genres=df["genres"].astype(str))
+        row_hashes = pd.util.hash_pandas_object(df, index=False)
+        grouped = pd.Series(row_hashes.to_numpy(), index=df["movieID"].astype(object).to_numpy())
+        for movie_id, hashes in grouped.groupby(level=0, sort=False):
+            digest = digests.setdefault(movie_id, hashlib.blake2b(digest_size=16))
+            digest.update(name.encode())
+            digest.update(hashes.to_numpy().tobytes())
+    return {movie_id: digest.hexdigest() for movie_id, digest in digests.items()}
+
+def select_movies(dataframes: dict, movie_ids: set) -> dict:
+    """Returns the subset of every DataFrame belonging to the given movies."""
+    return {name: dataframes[name][dataframes[name]["movieID"].astype(object).isin(movie_ids)] for name in FRAME_NAMES}
+
+def build_personas_by_movie(dataframes: dict, movie_ids: set, max_conversations: int) -> dict:
+    """Builds and filters the persona entries of the given movies, grouped by movieID."""
+    subset = select_movies(dataframes, movie_ids)
+    rows = build_conversation_rows(subset)
+    rows["movieID"] = subset["conversations"].loc[rows.index, "movieID"].astype(object)
+
+    personas = {movie_id: [] for movie_id in movie_ids}
+    for movie_id, movie_rows in rows.groupby("movieID", sort=False):
+        personas[movie_id] = filter_by_conversation_count(aggregate_personas(movie_rows), max_conversations)
+    return personas
+
+def load_state(state_path: str, max_conversations: int) -> dict:
+    """Loads the per-movie state of a previous run, or an empty state if it is missing or stale."""
+    empty_state = {"movies": {}}
+    if not os.path.exists(state_path):
+        return empty_state
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except json.JSONDecodeError:
+        print(f"Warning: could not parse '{state_path}'. Rebuilding all movies.")
+        return empty_state
+
+    if (state.get("state_version") != STATE_VERSION or state.get("loader_version") != LOADER_VERSION
+            or state.get("max_conversations") != max_conversations):
+        print("Preprocessing state was written with different settings. Rebuilding all movies.")
+        return empty_state
+    return state
+
+def diff_entries(old_entries: list, new_entries: list) -> dict:
+    """Compares a movie's persona entries before and after a rebuild."""
+    key = lambda e: (e["side_character_name"], e["movie_title"])
+    old_by_key = {key(e): e for e in old_entries}
+    new_by_key = {key(e): e for e in new_entries}
+    return {
+        "added": [e for k, e in new_by_key.items() if k not in old_by_key],
+        "updated": [e for k, e in new_by_key.items() if k in old_by_key and old_by_key[k] != e],
+        "removed": [{"side_character_name": k[0], "movie_title": k[1]} for k in old_by_key if k not in new_by_key],
+    }
+
+def build_incremental(dataframes: dict, state_path: str, max_conversations: int) -> tuple:
+    """
+    Rebuilds only the movies whose raw rows changed since the last run.
+
+    The state file stores each movie's fingerprint and filtered persona entries. Entries of
+    unchanged movies are reused; the merged output lists movies in order of their first
+    conversation, matching a full rebuild on corpora whose conversations are grouped by movie.
+
+    Args:
+        dataframes: A dictionary of DataFrames from the loader module.
+        state_path: Path of the JSON state file, read and rewritten in place.
+        max_conversations: Maximum conversations per persona, as in the full build.
+
+    Returns:
+        A tuple of (merged persona list, delta dict with changed/removed movies and
+        added/updated/removed entries).
+    """
+    state = load_state(state_path, max_conversations)
+    previous = state["movies"]
+    fingerprints = movie_fingerprints(dataframes)
+
+    changed = {movie_id for movie_id, h in fingerprints.items() if previous.get(movie_id, {}).get("hash") != h}
+    removed_movies = [movie_id for movie_id in previous if movie_id not in fingerprints]
+    print(f"Incremental build: {len(changed)} changed, {len(removed_movies)} removed, "
+          f"{len(fingerprints) - len(changed)} unchanged movies.")
+
+    rebuilt = build_personas_by_movie(dataframes, changed, max_conversations) if changed else {}
+
+    delta = {"changed_movies": sorted(changed), "removed_movies": sorted(removed_movies),
+             "added": [], "updated": [], "removed": []}
+    movies = {}
+    for movie_id, h in fingerprints.items():
+        entries = rebuilt[movie_id] if movie_id in changed else previous[movie_id]["entries"]
+        if movie_id in changed:
+            movie_delta = diff_entries(previous.get(movie_id, {}).get("entries", []), entries)
+            for kind, items in movie_delta.items():
+                delta[kind].extend(items)
+        movies[movie_id] = {"hash": h, "entries": entries}
+    for movie_id in removed_movies:
+        delta["removed"].extend(diff_entries(previous[movie_id]["entries"], [])["removed"])
+
+    # Order movies like the full build: by first appearance in the conversations file
+    conversation_order = pd.unique(dataframes["conversations"]["movieID"].astype(object))
+    ordered_ids = [m for m in conversation_order if m in movies]
+    seen = set(ordered_ids)
+    ordered_ids += [m for m in movies if m not in seen]
+    merged = [entry for movie_id in ordered_ids for entry in movies[movie_id]["entries"]]
+
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "state_version": STATE_VERSION,
+            "loader_version": LOADER_VERSION,
+            "max_conversations": max_conversations,
+            "movies": {movie_id: movies[movie_id] for movie_id in ordered_ids},
+        }, f, ensure_ascii=False)
+
+    return merged, delta
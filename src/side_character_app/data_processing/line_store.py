@@ -0,0 +1,83 @@
+# src/side_character_app/data_processing/line_store.py
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+class LineStore:
+    """
+    Compact, integer-keyed storage of movie lines for utterance lookup.
+
+    Line IDs such as 'L1045' are parsed once into a sorted int64 array. All line texts live in a
+    single string buffer addressed through a character-offsets array (Latin-1 corpus text
+    keeps it at one byte per character), and character names are interned as int32 codes
+    into a list of unique names.
+    """
+
+    def __init__(self, line_ids: np.ndarray, offsets: np.ndarray, buffer: str, name_codes: np.ndarray, names: list):
+        self.line_ids = line_ids
+        self.offsets = offsets
+        self.buffer = buffer
+        self.name_codes = name_codes
+        self.names = names
+
+    @classmethod
+    def from_dataframe(cls, lines_df: pd.DataFrame) -> "LineStore":
+        """Builds a store from the loader's lines DataFrame; the last duplicate line ID wins."""
+        raw_ids = lines_df["lineID"].astype(str)
+        valid = raw_ids.str.fullmatch(r"L\d+").to_numpy(dtype=bool)
+        numbers = raw_ids[valid].str[1:].astype(np.int64).to_numpy()
+        texts = lines_df["text"].astype(str).to_numpy()[valid]
+        name_codes, names = pd.factorize(lines_df["character_name"].astype(str).to_numpy()[valid])
+
+        # Keep the last occurrence of each ID, then order by ID for binary search
+        reversed_unique = np.unique(numbers[::-1], return_index=True)[1]
+        keep = len(numbers) - 1 - reversed_unique
+        order = keep[np.argsort(numbers[keep], kind="stable")]
+
+        ordered_texts = texts[order]
+        offsets = np.zeros(len(ordered_texts) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, ordered_texts), dtype=np.int64, count=len(ordered_texts)), out=offsets[1:])
+
+        return cls(
+            line_ids=numbers[order],
+            offsets=offsets,
+            buffer="".join(ordered_texts),
+            name_codes=name_codes[order].astype(np.int32),
+            names=list(names),
+        )
+
+    def __len__(self) -> int:
+        return len(self.line_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the store's arrays and text buffer."""
+        return self.line_ids.nbytes + self.offsets.nbytes + sys.getsizeof(self.buffer) + self.name_codes.nbytes
+
+    def positions(self, line_numbers: np.ndarray) -> np.ndarray:
+        """Maps integer line IDs to store positions in bulk; unknown IDs map to -1."""
+        line_numbers = np.asarray(line_numbers, dtype=np.int64)
+        if not len(self.line_ids):
+            return np.full(len(line_numbers), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.line_ids, line_numbers), len(self.line_ids) - 1)
+        return np.where(self.line_ids[positions] == line_numbers, positions, -1)
+
+    def text(self, position: int) -> str:
+        """Returns the text of the line stored at `position`."""
+        return self.buffer[self.offsets[position]:self.offsets[position + 1]]
+
+    def name(self, position: int) -> str:
+        """Returns the speaking character's name for the line stored at `position`."""
+        return self.names[self.name_codes[position]]
+
+    def format_lines(self, positions: np.ndarray) -> list:
+        """Formats the lines at the given (valid) positions as 'NAME: text'."""
+        offsets, buffer, names, codes = self.offsets, self.buffer, self.names, self.name_codes
+        return [f"{names[codes[p]]}: {buffer[offsets[p]:offsets[p + 1]]}" for p in positions]
+
+    def utterances(self, line_numbers: list) -> list:
+        """Returns (character_name, text) pairs for a conversation's line IDs, skipping unknown ones."""
+        positions = self.positions(np.asarray(line_numbers, dtype=np.int64))
+        return [(self.name(p), self.text(p)) for p in positions[positions >= 0]]
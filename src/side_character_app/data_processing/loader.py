@@ -1,19 +1,105 @@
 # src/chosen_app/data_processing/loader.py
 
 import pandas as pd
+from pandas.api.types import union_categoricals
 import re
 import os
+from itertools import islice
+from typing import Iterator, Optional
+
+# Bump whenever the cleaning logic changes so cached corpora are invalidated
+LOADER_VERSION = 2
+RAW_FILES = ["movie_titles_metadata.tsv", "movie_characters_metadata.tsv", "movie_lines.tsv", "movie_conversations.tsv"]
+LINES_ENCODING = "iso-8859-1" # Use iso-8859-1 for better compatibility
+LINES_COLUMNS = ["lineID", "characterID", "movieID", "character_name", "text"]
+CATEGORICAL_LINE_COLUMNS = ["characterID", "movieID", "character_name"]
+DEFAULT_LINES_CHUNK_SIZE = 100_000
+# Rough per-row cost of a parsed chunk: five Python str objects plus list slots
+ROW_OVERHEAD_BYTES = 5 * (49 + 8)
 
 def parse_genres(raw_text: str) -> list:
     """Extracts a list of genres from the raw string representation."""
     return re.findall(r"'([^']+)'", raw_text)
 
-def load_and_clean_data(data_dir: str) -> dict:
+def estimate_chunk_size(lines_path: str, memory_budget_mb: float, sample_lines: int = 1000) -> int:
+    """Estimates how many lines of movie_lines.tsv can be parsed per chunk within a memory budget."""
+    with open(lines_path, "r", encoding=LINES_ENCODING) as f:
+        sample = list(islice(f, sample_lines))
+    avg_line_bytes = sum(len(line) for line in sample) / len(sample) if sample else 1
+    budget_bytes = memory_budget_mb * 1024 * 1024
+    return max(1, int(budget_bytes // (avg_line_bytes + ROW_OVERHEAD_BYTES)))
+
+def iter_line_chunks(lines_path: str, chunk_size: int = DEFAULT_LINES_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Streams movie_lines.tsv as typed, columnar DataFrame chunks of at most `chunk_size` rows.
+
+    Lines with fewer than five fields are skipped; tabs inside the text field are preserved.
+    """
+    with open(lines_path, "r", encoding=LINES_ENCODING) as f:
+        while True:
+            raw_lines = list(islice(f, chunk_size))
+            if not raw_lines:
+                break
+            columns = ([], [], [], [], [])
+            for line in raw_lines:
+                fields = line.strip().split("\t", 4)
+                if len(fields) < 5:
+                    continue
+                for column, value in zip(columns, fields):
+                    column.append(value)
+            del raw_lines
+
+            chunk = pd.DataFrame({
+                "lineID": pd.Series(columns[0], dtype=object),
+                "characterID": pd.Categorical(columns[1]),
+                "movieID": pd.Categorical(columns[2]),
+                "character_name": pd.Categorical(columns[3]),
+                "text": pd.Series(columns[4], dtype=object).str.replace('""', '"', regex=False),
+            }, columns=LINES_COLUMNS)
+            yield chunk
+
+def load_lines(lines_path: str, chunk_size: Optional[int] = None, memory_budget_mb: Optional[float] = None) -> pd.DataFrame:
+    """
+    Loads movie_lines.tsv chunk by chunk into a single columnar DataFrame.
+
+    Args:
+        lines_path: Path to movie_lines.tsv.
+        chunk_size: Number of lines parsed per chunk. Defaults to DEFAULT_LINES_CHUNK_SIZE.
+        memory_budget_mb: If given (and no chunk_size), the chunk size is derived so that a
+            single chunk's intermediate Python objects stay within this many megabytes.
+
+    Returns:
+        A DataFrame with string lineID/text columns and categorical characterID, movieID
+        and character_name columns.
+    """
+    if chunk_size is None:
+        chunk_size = estimate_chunk_size(lines_path, memory_budget_mb) if memory_budget_mb else DEFAULT_LINES_CHUNK_SIZE
+
+    chunks = list(iter_line_chunks(lines_path, chunk_size))
+    if not chunks:
+        return pd.DataFrame({column: pd.Series(dtype="category" if column in CATEGORICAL_LINE_COLUMNS else object)
+                             for column in LINES_COLUMNS})
+
+    # Merge categories across chunks so the combined columns stay categorical
+    columns = {}
+    for column in LINES_COLUMNS:
+        parts = [chunk[column] for chunk in chunks]
+        if column in CATEGORICAL_LINE_COLUMNS:
+            columns[column] = pd.Series(union_categoricals(parts))
+        else:
+            columns[column] = pd.concat(parts, ignore_index=True)
+        for chunk in chunks:
+            del chunk[column]
+    return pd.DataFrame(columns)
+
+def load_and_clean_data(data_dir: str, chunk_size: Optional[int] = None, memory_budget_mb: Optional[float] = None) -> dict:
     """
     Loads and performs initial cleaning on the four Cornell Movie-Dialogs corpus files.
 
     Args:
         data_dir: The path to the directory containing the raw .tsv files.
+        chunk_size: Optional number of lines parsed per chunk from movie_lines.tsv.
+        memory_budget_mb: Optional memory budget for a single chunk of movie_lines.tsv.
 
     Returns:
         A dictionary of cleaned pandas DataFrames.
@@ -36,20 +122,7 @@ def load_and_clean_data(data_dir: str) -> dict:
 
     # --- Load lines ---
     lines_path = os.path.join(data_dir, "movie_lines.tsv")
-    parsed_rows = []
-    with open(lines_path, "r", encoding="iso-8859-1") as f: # Use iso-8859-1 for better compatibility
-        for line in f:
-            fields = line.strip().split("\t")
-            if len(fields) < 5:
-                continue
-            parsed_rows.append({
-                "lineID": fields[0],
-                "characterID": fields[1],
-                "movieID": fields[2],
-                "character_name": fields[3],
-                "text": "\t".join(fields[4:]).replace('""', '"')
-            })
-    lines_df = pd.DataFrame(parsed_rows)
+    lines_df = load_lines(lines_path, chunk_size=chunk_size, memory_budget_mb=memory_budget_mb)
 
     # --- Load conversations ---
     conversations_path = os.path.join(data_dir, "movie_conversations.tsv")
@@ -0,0 +1,77 @@
+# src/side_character_app/data_processing/parallel.py
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .builder import build_conversation_rows, aggregate_personas
+
+def assign_movie_shards(conversations_df: pd.DataFrame, num_shards: int) -> dict:
+    """
+    Deterministically assigns each movieID to a shard, balancing conversation counts.
+
+    Movies are placed largest-first onto the currently lightest shard (ties broken by
+    movieID and shard number), so the same input always yields the same assignment.
+    """
+    counts = conversations_df["movieID"].value_counts(sort=False)
+    movies = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+    loads = [0] * num_shards
+    assignment = {}
+    for movie_id, count in movies:
+        shard = min(range(num_shards), key=lambda i: (loads[i], i))
+        assignment[movie_id] = shard
+        loads[shard] += count
+    return assignment
+
+def shard_dataframes(dataframes: dict, num_shards: int) -> list:
+    """Splits every DataFrame by movieID into `num_shards` self-contained corpora."""
+    assignment = assign_movie_shards(dataframes["conversations"], num_shards)
+    shards = [{} for _ in range(num_shards)]
+    for name in ["titles", "characters", "lines", "conversations"]:
+        df = dataframes[name]
+        # Rows of movies without conversations are not needed by any shard
+        shard_ids = df["movieID"].astype(object).map(assignment).fillna(-1).astype(int).to_numpy()
+        for shard, shard_df in df.groupby(shard_ids, sort=False):
+            if shard >= 0:
+                shards[shard][name] = shard_df
+        for shard in shards:
+            shard.setdefault(name, df.iloc[0:0])
+    return shards
+
+def _build_shard(shard_number: int, shard: dict) -> tuple:
+    """Worker entry point: builds the conversation rows of one shard and times it."""
+    start = time.perf_counter()
+    rows = build_conversation_rows(shard)
+    elapsed = time.perf_counter() - start
+    stats = {
+        "shard": shard_number,
+        "movies": int(shard["conversations"]["movieID"].nunique()),
+        "conversations": len(shard["conversations"]),
+        "rows": len(rows),
+        "seconds": elapsed,
+    }
+    return rows, stats
+
+def build_side_character_conversations_parallel(dataframes: dict, workers: int) -> tuple:
+    """
+    Builds the persona dataset with the per-movie work spread over a process pool.
+
+    Shard outputs are concatenated and re-sorted by original conversation position before
+    aggregation, so the result is identical to build_side_character_conversations.
+
+    Args:
+        dataframes: A dictionary of DataFrames from the loader module.
+        workers: Number of worker processes (and shards).
+
+    Returns:
+        A tuple of (persona list, list of per-shard timing dicts).
+    """
+    print(f"Building structured conversations across {workers} worker processes...")
+    shards = shard_dataframes(dataframes, workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        outputs = list(executor.map(_build_shard, range(workers), shards))
+
+    rows = pd.concat([shard_rows for shard_rows, _ in outputs]).sort_index(kind="stable")
+    shard_stats = [stats for _, stats in outputs]
+    return aggregate_personas(rows), shard_stats
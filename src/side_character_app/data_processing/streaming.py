@@ -0,0 +1,65 @@
+# src/side_character_app/data_processing/streaming.py
+
+import json
+import os
+import time
+from typing import Iterable, Iterator
+
+PARTIAL_SUFFIX = ".partial"
+
+def write_personas_jsonl(entries: Iterable[dict], path: str) -> int:
+    """
+    Writes persona entries as newline-delimited JSON while they are being produced.
+
+    Lines go to `<path>.partial` and are flushed one by one, so a reader can follow the file
+    as it grows. The file is renamed to `path` once the stream is exhausted.
+
+    Returns:
+        The number of entries written.
+    """
+    partial_path = path + PARTIAL_SUFFIX
+    count = 0
+    with open(partial_path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            count += 1
+    os.replace(partial_path, path)
+    return count
+
+def iter_personas_jsonl(path: str, follow: bool = False, poll_interval: float = 1.0) -> Iterator[dict]:
+    """
+    Lazily yields persona entries from a JSONL file, one line at a time.
+
+    Args:
+        path: Path of the finished JSONL file.
+        follow: If True and the file is still being written (only `<path>.partial` exists),
+            keep reading new lines until the writer renames it to `path`.
+        poll_interval: Seconds to wait between checks for new lines while following.
+    """
+    partial_path = path + PARTIAL_SUFFIX
+    if follow:
+        while not os.path.exists(path) and not os.path.exists(partial_path):
+            time.sleep(poll_interval)
+    open_path = path if os.path.exists(path) else partial_path
+
+    with open(open_path, "r", encoding="utf-8") as f:
+        buffer = ""
+        while True:
+            line = f.readline()
+            if line:
+                buffer += line
+                if buffer.endswith("\n"):
+                    if buffer.strip():
+                        yield json.loads(buffer)
+                    buffer = ""
+                continue
+            # End of file: stop unless the writer is still producing the partial file
+            if not follow or open_path == path or not os.path.exists(partial_path):
+                # The writer may have appended its last lines just before the rename
+                rest = buffer + f.read()
+                for tail_line in rest.splitlines():
+                    if tail_line.strip():
+                        yield json.loads(tail_line)
+                return
+            time.sleep(poll_interval)
@@ -1,33 +1,66 @@
 # src/side_character_app/vector_store/builder.py
 
+import hashlib
 import json
+import os
 import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from pymilvus import MilvusClient
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
-def init_collection(client: MilvusClient, collection_name: str, dimension: int):
+from .chunking import CHUNK_FIELDS, ChunkConfig, chunk_rows
+from .index_config import IndexConfig, collection_schema
+from .layout import init_partitioned_collection
+from .partitions import PARTITIONED_COLLECTION, partition_name
+from .quantization import fit_vector, vector_format
+
+# Batch size used when paging through the primary keys of an existing collection
+ID_QUERY_BATCH_SIZE = 1000
+# Conversations per embedding request / insert, and embedding requests running at once
+DEFAULT_EMBED_BATCH_SIZE = 100
+DEFAULT_MAX_IN_FLIGHT = 4
+
+def embedding_dimension(embedding_fn) -> int:
+    """Returns the embedding dimension, using a cached value (see CachedEmbeddings) when available."""
+    dimension = getattr(embedding_fn, "dimension", None)
+    if dimension:
+        return dimension
+    # Determine embedding dimension from a test query
+    return len(embedding_fn.embed_query("test"))
+
+def init_collection(client: MilvusClient, collection_name: str, dimension: int, index_config: Optional[IndexConfig] = None):
     """
-    Drops and recreates a Milvus collection. This is the simple version
-    that matches the original notebook's behavior.
+    Drops and recreates a Milvus collection. Without `index_config` this is the simple
+    version that matches the original notebook's behavior (Milvus' default index);
+    otherwise the vector field is stored and indexed as configured.
     """
     if client.has_collection(collection_name=collection_name):
         client.drop_collection(collection_name=collection_name)
         print(f"Dropped existing collection: '{collection_name}'")
-    
+
+    if index_config is None:
+        client.create_collection(
+            collection_name=collection_name,
+            dimension=dimension
+        )
+        print(f"Created new collection: '{collection_name}'")
+        return
+
     client.create_collection(
         collection_name=collection_name,
-        dimension=dimension
+        schema=collection_schema(index_config.stored_dimension(dimension), index_config.vector_datatype),
+        index_params=index_config.index_params(client, dimension)
     )
-    print(f"Created new collection: '{collection_name}'")
+    print(f"Created new collection: '{collection_name}' ({index_config.name})")
 
-def prepare_data_for_collection(embedding_fn: GoogleGenerativeAIEmbeddings, json_path: str, target_label: str, min_confidence: int) -> list:
-    """
-    Loads, filters, and embeds data for a specific persona label,
-    including the mandatory 'id' field, just like in the original notebook.
-    """
+def load_labeled_rows(json_path: str) -> list:
+    """Loads the labeled conversations JSON file, returning an empty list on errors."""
     try:
         with open(json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+            return json.load(f)
     except FileNotFoundError:
         print(f"Error: The file '{json_path}' was not found.")
         return []
@@ -35,25 +68,99 @@ def prepare_data_for_collection(embedding_fn: GoogleGenerativeAIEmbeddings, json
         print(f"Error decoding JSON from '{json_path}'. The file may be corrupted. Details: {e}")
         return []
 
-    filtered = [entry for entry in data if entry.get("label") == target_label and entry.get("confidence", 0) >= min_confidence]
+def iter_labeled_rows(path: str) -> Iterator[Dict]:
+    """
+    Yields labeled conversation rows one at a time.
+
+    A `.jsonl` file is streamed line by line, so memory does not grow with the dataset;
+    a JSON array file is loaded with load_labeled_rows.
+    """
+    if not path.endswith(".jsonl"):
+        yield from load_labeled_rows(path)
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def row_matches(entry: Dict, target_label: str, min_confidence: int) -> bool:
+    """True if a row has the given label and a confidence of at least `min_confidence`."""
+    return entry.get("label") == target_label and entry.get("confidence", 0) >= min_confidence
+
+def filter_rows(data: Iterable[Dict], target_label: str, min_confidence: int) -> list:
+    """Keeps the rows of one label whose confidence is at least `min_confidence`."""
+    return [entry for entry in data if row_matches(entry, target_label, min_confidence)]
+
+def stable_id(row: Dict) -> int:
+    """
+    Derives a primary key from everything stored for a conversation.
+
+    The same row always gets the same id across builds, and any change to the stored
+    fields gives a new id, so a rebuild can tell unchanged, new and removed rows apart
+    by id alone. Ids are non-negative 63-bit integers, as Milvus INT64 keys must fit.
+    Chunk rows (see chunking.chunk_rows) also hash their chunk fields.
+    """
+    fields = [
+        row.get("character_name"), row.get("movie_title"), row.get("conversation_id"), row["conversation"],
+        row.get("confidence"), row.get("genre", []), row.get("label"),
+    ]
+    if "parent_id" in row:
+        fields += [row[key] for key in CHUNK_FIELDS]
+    payload = json.dumps(fields)
+    digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") & (2 ** 63 - 1)
+
+def to_entity(row: Dict, vector) -> Dict:
+    """Builds the Milvus entity stored for one labeled conversation row."""
+    return {
+        "id": stable_id(row),
+        "vector": vector,
+        "conversation": row["conversation"],
+        "character_name": row["character_name"],
+        "confidence": row["confidence"],
+        "genres": ",".join(row.get("genre", [])),
+        **{key: row[key] for key in CHUNK_FIELDS if key in row},
+    }
+
+def to_partitioned_entity(row: Dict, vector) -> Dict:
+    """Builds the entity stored for a row in the partitioned collection, with typed scalar fields."""
+    return {
+        "id": stable_id(row),
+        "vector": vector,
+        "conversation": row["conversation"],
+        "character_name": row["character_name"],
+        "archetype": row["label"],
+        "confidence": int(row["confidence"]),
+        "genres": list(row.get("genre", [])),
+        **{key: row[key] for key in CHUNK_FIELDS if key in row},
+    }
+
+def prepare_data_for_collection(embedding_fn: GoogleGenerativeAIEmbeddings, json_path: str, target_label: str, min_confidence: int,
+                                chunk_config: Optional[ChunkConfig] = None) -> list:
+    """
+    Loads, filters, and embeds data for a specific persona label,
+    including the mandatory 'id' field, just like in the original notebook.
+    With `chunk_config`, turn-window chunks are embedded instead of whole conversations.
+    """
+    data = load_labeled_rows(json_path)
+    if not data:
+        return []
+
+    filtered = filter_rows(data, target_label, min_confidence)
     if not filtered:
         print(f"No entries found for label '{target_label}' with confidence >= {min_confidence}. Skipping.")
         return []
+    if chunk_config:
+        filtered = [chunk for entry in filtered for chunk in chunk_rows(entry, stable_id(entry), chunk_config)]
 
-    print(f"Embedding {len(filtered)} conversations for label '{target_label}'...")
+    print(f"Embedding {len(filtered)} {'chunks' if chunk_config else 'conversations'} for label '{target_label}'...")
     texts = [entry["conversation"] for entry in filtered]
     vectors = embedding_fn.embed_documents(texts)
 
     # **THE FIX**: This dictionary now exactly matches the structure from the
     # original working notebook, including the mandatory 'id' field.
-    prepared_data = [{
-        "id": i,
-        "vector": vectors[i],
-        "conversation": filtered[i]["conversation"],
-        "character_name": filtered[i]["character_name"],
-        "confidence": filtered[i]["confidence"],
-        "genres": ",".join(filtered[i].get("genre", [])),
-    } for i in range(len(filtered))]
+    # Ids are content hashes (see stable_id) so incremental builds can diff against them.
+    prepared_data = [to_entity(filtered[i], vectors[i]) for i in range(len(filtered))]
 
     print(f"Prepared {len(prepared_data)} vector entries.")
     return prepared_data
@@ -65,11 +172,308 @@ def insert_data(client: MilvusClient, collection_name: str, data: list):
     res = client.insert(collection_name=collection_name, data=data)
     print(f"Inserted {res['insert_count']} entries into '{collection_name}'.")
 
-def build_persona_vector_db(client: MilvusClient, embedding_fn: GoogleGenerativeAIEmbeddings, json_path: str, collection_name: str, label: str, min_confidence: int):
-    """A full pipeline to initialize, prepare, and insert data for one persona."""
-    # Determine embedding dimension from a test query
-    dimension = len(embedding_fn.embed_query("test"))
-    
-    init_collection(client, collection_name, dimension)
-    data_to_insert = prepare_data_for_collection(embedding_fn, json_path, target_label=label, min_confidence=min_confidence)
-    insert_data(client, collection_name, data_to_insert)
\ No newline at end of file
+def fetch_existing_ids(client: MilvusClient, collection_name: str, partition_name: Optional[str] = None) -> Set[int]:
+    """Returns the primary keys of every entity currently stored in a collection (or one of its partitions)."""
+    ids = set()
+    partition_kwargs = {"partition_names": [partition_name]} if partition_name else {}
+    # All ids written by this module (and the old enumerate-based ones) are non-negative
+    iterator = client.query_iterator(collection_name=collection_name, batch_size=ID_QUERY_BATCH_SIZE,
+                                     filter="id >= 0", output_fields=["id"], **partition_kwargs)
+    while True:
+        batch = iterator.next()
+        if not batch:
+            iterator.close()
+            break
+        ids.update(item["id"] for item in batch)
+    return ids
+
+def route_batches(routed_rows: Iterable[Tuple[str, Dict]], batch_size: int,
+                  skip_batches: Optional[Dict[str, int]] = None) -> Iterator[Tuple[str, int, list]]:
+    """
+    Groups (collection_name, row) pairs into per-collection batches of at most `batch_size` rows.
+
+    Yields (collection_name, batch_index, rows) as soon as a collection's batch is full,
+    then the partial batches at the end. Batch indexes count per collection, and the first
+    `skip_batches[collection_name]` batches of a collection are dropped (used to resume).
+    """
+    skip_batches = skip_batches or {}
+    buffers, counts = {}, {}
+    for collection_name, row in routed_rows:
+        buffer = buffers.setdefault(collection_name, [])
+        buffer.append(row)
+        if len(buffer) >= batch_size:
+            index = counts.get(collection_name, 0)
+            counts[collection_name] = index + 1
+            if index >= skip_batches.get(collection_name, 0):
+                yield collection_name, index, buffer
+            buffers[collection_name] = []
+    for collection_name, buffer in buffers.items():
+        index = counts.get(collection_name, 0)
+        if buffer and index >= skip_batches.get(collection_name, 0):
+            yield collection_name, index, buffer
+
+def write_batches(client: MilvusClient, embedding_fn: GoogleGenerativeAIEmbeddings, batches: Iterable[Tuple[str, int, list]],
+                  max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, on_batch_done: Optional[Callable[[str, int], None]] = None,
+                  timings: Optional[Dict[str, Dict[str, float]]] = None, partitioned_collection: Optional[str] = None,
+                  vector_formats: Optional[Dict[str, Tuple[int, bool]]] = None) -> Dict[str, int]:
+    """
+    Embeds batches with several requests in flight and upserts each batch as it completes.
+
+    Batches (as produced by route_batches) are written in the order they arrive, and at
+    most `2 * max_in_flight` of them are held in memory at once, however many rows there
+    are. `on_batch_done(collection_name, n)` is called after a collection's n-th batch has
+    been written; since ids are stable, re-writing a batch is harmless. If `timings` is
+    given, the seconds spent embedding and writing are added up per collection in it.
+    With `partitioned_collection`, batches are routed by partition name instead and
+    written to that partition of the collection (see build_partitioned_persona_db).
+    `vector_formats` gives the (dimension, float16) a collection stores its vectors in
+    (see vector_format); embeddings are truncated and converted to match before writing.
+
+    Returns:
+        The number of entities written per collection.
+    """
+    written = {}
+    pending = deque()
+
+    def embed(texts: List[str]):
+        start = time.perf_counter()
+        vectors = embedding_fn.embed_documents(texts)
+        return vectors, time.perf_counter() - start
+
+    def write(collection_name: str, index: int, batch: list, future):
+        vectors, embed_seconds = future.result()
+        start = time.perf_counter()
+        if vector_formats and collection_name in vector_formats:
+            vectors = [fit_vector(vector, *vector_formats[collection_name]) for vector in vectors]
+        if partitioned_collection:
+            client.upsert(collection_name=partitioned_collection, partition_name=collection_name,
+                          data=[to_partitioned_entity(row, vector) for row, vector in zip(batch, vectors)])
+        else:
+            client.upsert(collection_name=collection_name, data=[to_entity(row, vector) for row, vector in zip(batch, vectors)])
+        if timings is not None:
+            timing = timings.setdefault(collection_name, {"embed_seconds": 0.0, "write_seconds": 0.0})
+            timing["embed_seconds"] += embed_seconds
+            timing["write_seconds"] += time.perf_counter() - start
+        written[collection_name] = written.get(collection_name, 0) + len(batch)
+        if on_batch_done:
+            on_batch_done(collection_name, index + 1)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for collection_name, index, batch in batches:
+            future = executor.submit(embed, [row["conversation"] for row in batch])
+            pending.append((collection_name, index, batch, future))
+            if len(pending) >= 2 * max_in_flight:
+                write(*pending.popleft())
+        while pending:
+            write(*pending.popleft())
+    return written
+
+def input_fingerprint(path: str, label: str, min_confidence: int, batch_size: int,
+                      chunk_config: Optional[ChunkConfig] = None) -> str:
+    """Identifies a build's input and settings, so a checkpoint is only reused for the same build."""
+    stat = os.stat(path)
+    fingerprint = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}:{label}:{min_confidence}:{batch_size}"
+    return fingerprint + (f":{chunk_config.name}" if chunk_config else "")
+
+def load_checkpoint(checkpoint_path: str) -> Dict:
+    try:
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_checkpoint(checkpoint_path: str, collection_name: str, progress: Optional[Dict]):
+    """Records (or, with progress=None, clears) the build progress of one collection."""
+    checkpoints = load_checkpoint(checkpoint_path)
+    if progress is None:
+        checkpoints.pop(collection_name, None)
+    else:
+        checkpoints[collection_name] = progress
+    temp_path = checkpoint_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoints, f, indent=2)
+    os.replace(temp_path, checkpoint_path)
+
+def build_all_persona_vector_dbs(client: MilvusClient, embedding_fn: GoogleGenerativeAIEmbeddings, json_path: str,
+                                 collections: Dict[str, str], min_confidence: int, incremental: bool = False,
+                                 batch_size: int = DEFAULT_EMBED_BATCH_SIZE, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                                 checkpoint_path: Optional[str] = None, index_config: Optional[IndexConfig] = None,
+                                 partitioned_collection: Optional[str] = None,
+                                 chunk_config: Optional[ChunkConfig] = None) -> Dict[str, Dict]:
+    """
+    Builds the collections of several personas in a single streaming pass over the labeled data.
+
+    `collections` maps each label to its collection name. Every row is read once and routed
+    to its label's collection if its confidence is at least `min_confidence`; all collections
+    share one pool of embedding requests (see write_batches). Use a `.jsonl` input to keep
+    memory bounded.
+
+    Collections are dropped and rebuilt, except that:
+      - with `checkpoint_path`, progress is saved after every batch, and a collection whose
+        interrupted build used the same input resumes where it stopped;
+      - with `incremental=True`, existing collections are synced instead: only rows whose
+        stable id is not stored yet are embedded and upserted, and ids that no longer match
+        any row are deleted, leaving unchanged vectors untouched.
+
+    New collections are indexed as described by `index_config` (Milvus' default index when
+    None); synced and resumed collections keep the index they were created with.
+
+    With `partitioned_collection`, `collections` maps each label to a partition of that one
+    collection instead (see build_partitioned_persona_db). The partitions share the
+    collection, so unless every partition can resume or be synced it is rebuilt as a whole.
+
+    With `chunk_config`, each conversation is stored as turn-window chunks pointing to it
+    (see chunking.chunk_rows) instead of as a whole, so searches match the relevant part of
+    a long conversation and return only that part. A collection should hold only chunks or
+    only whole conversations; switch between them with a full rebuild.
+
+    Returns:
+        Per-collection stats: "rows" (conversations) routed to it, "written" entities, summed "embed_seconds"
+        and "write_seconds", and for synced collections "added", "removed" and "unchanged".
+    """
+    if not os.path.exists(json_path):
+        print(f"Error: The file '{json_path}' was not found.")
+        return {}
+
+    def location(collection_name: str) -> Tuple[str, Optional[str]]:
+        # (collection, partition) a routing target is stored in
+        if partitioned_collection:
+            return partitioned_collection, collection_name
+        return collection_name, None
+
+    def checkpoint_key(collection_name: str) -> str:
+        return "/".join(part for part in location(collection_name) if part)
+
+    stats = {collection_name: {"rows": 0} for collection_name in collections.values()}
+    existing = {}
+    if incremental:
+        for collection_name in collections.values():
+            target_collection, target_partition = location(collection_name)
+            if not client.has_collection(collection_name=target_collection):
+                continue
+            if target_partition and not client.has_partition(collection_name=target_collection, partition_name=target_partition):
+                client.create_partition(collection_name=target_collection, partition_name=target_partition)
+            existing[collection_name] = fetch_existing_ids(client, target_collection, target_partition)
+
+    fingerprints = {collection_name: input_fingerprint(json_path, label, min_confidence, batch_size, chunk_config)
+                    for label, collection_name in collections.items()}
+    saved_progress = load_checkpoint(checkpoint_path) if checkpoint_path else {}
+    skip_batches = {}
+    fresh = []
+    for collection_name in collections.values():
+        if collection_name in existing:
+            continue
+        progress = saved_progress.get(checkpoint_key(collection_name))
+        if progress and progress["fingerprint"] == fingerprints[collection_name] \
+                and client.has_collection(collection_name=location(collection_name)[0]):
+            skip_batches[collection_name] = progress["batches_done"]
+        else:
+            fresh.append(collection_name)
+    if fresh:
+        dimension = embedding_dimension(embedding_fn)
+        if partitioned_collection:
+            skip_batches = {}
+            init_partitioned_collection(client, partitioned_collection, dimension, list(collections.values()), index_config)
+        else:
+            for collection_name in fresh:
+                init_collection(client, collection_name, dimension, index_config)
+    for collection_name, batches_done in skip_batches.items():
+        print(f"Resuming '{checkpoint_key(collection_name)}' after {batches_done} completed batches.")
+    # Synced and resumed collections keep the vector format they were created with
+    vector_formats = {}
+    for collection_name in collections.values():
+        target_collection = location(collection_name)[0]
+        if target_collection not in vector_formats:
+            vector_formats[target_collection] = vector_format(client, target_collection)
+        vector_formats[collection_name] = vector_formats[target_collection]
+
+    desired = {collection_name: set() for collection_name in existing}
+    rows_read = 0
+
+    def routed_rows():
+        nonlocal rows_read
+        for row in iter_labeled_rows(json_path):
+            rows_read += 1
+            collection_name = collections.get(row.get("label"))
+            if collection_name is None or row.get("confidence", 0) < min_confidence:
+                continue
+            stats[collection_name]["rows"] += 1
+            for entity_row in (chunk_rows(row, stable_id(row), chunk_config) if chunk_config else [row]):
+                if collection_name in existing:
+                    row_id = stable_id(entity_row)
+                    seen = row_id in desired[collection_name]
+                    desired[collection_name].add(row_id)
+                    if seen or row_id in existing[collection_name]:
+                        continue
+                yield collection_name, entity_row
+
+    def record_progress(collection_name: str, batches_done: int):
+        if collection_name not in existing:
+            save_checkpoint(checkpoint_path, checkpoint_key(collection_name),
+                            {"fingerprint": fingerprints[collection_name], "batches_done": batches_done})
+
+    timings = {}
+    written = write_batches(client, embedding_fn, route_batches(routed_rows(), batch_size, skip_batches),
+                            max_in_flight=max_in_flight, on_batch_done=record_progress if checkpoint_path else None,
+                            timings=timings, partitioned_collection=partitioned_collection, vector_formats=vector_formats)
+
+    for collection_name, collection_stats in stats.items():
+        collection_stats["written"] = written.get(collection_name, 0)
+        collection_stats.update(timings.get(collection_name, {"embed_seconds": 0.0, "write_seconds": 0.0}))
+        if collection_name in existing:
+            # Never treat an unreadable or empty input as "everything was removed"
+            removed_ids = list(existing[collection_name] - desired[collection_name]) if rows_read else []
+            if removed_ids:
+                target_collection, target_partition = location(collection_name)
+                partition_kwargs = {"partition_name": target_partition} if target_partition else {}
+                client.delete(collection_name=target_collection, ids=removed_ids, **partition_kwargs)
+            collection_stats.update({"added": collection_stats["written"], "removed": len(removed_ids),
+                                     "unchanged": len(desired[collection_name]) - collection_stats["written"]})
+            print(f"Synced '{checkpoint_key(collection_name)}': {collection_stats['added']} added, {collection_stats['removed']} removed, "
+                  f"{collection_stats['unchanged']} unchanged.")
+        else:
+            if checkpoint_path:
+                save_checkpoint(checkpoint_path, checkpoint_key(collection_name), None)
+            print(f"Inserted {collection_stats['written']} entries into '{checkpoint_key(collection_name)}'.")
+    return stats
+
+def build_persona_vector_db(client: MilvusClient, embedding_fn: GoogleGenerativeAIEmbeddings, json_path: str, collection_name: str, label: str, min_confidence: int,
+                            incremental: bool = False, batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+                            max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, checkpoint_path: Optional[str] = None,
+                            index_config: Optional[IndexConfig] = None,
+                            chunk_config: Optional[ChunkConfig] = None) -> Optional[Dict]:
+    """
+    A full pipeline to initialize, prepare, and insert data for one persona.
+
+    This is build_all_persona_vector_dbs for a single label; see there for the streaming,
+    checkpointing and incremental behavior. Returns the collection's build stats.
+    """
+    stats = build_all_persona_vector_dbs(client, embedding_fn, json_path, {label: collection_name}, min_confidence,
+                                         incremental=incremental, batch_size=batch_size, max_in_flight=max_in_flight,
+                                         checkpoint_path=checkpoint_path, index_config=index_config,
+                                         chunk_config=chunk_config)
+    return stats.get(collection_name)
+
+def build_partitioned_persona_db(client: MilvusClient, embedding_fn: GoogleGenerativeAIEmbeddings, json_path: str, labels: List[str],
+                                 collection_name: str = PARTITIONED_COLLECTION, min_confidence: int = 0,
+                                 incremental: bool = False, batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+                                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, checkpoint_path: Optional[str] = None,
+                                 index_config: Optional[IndexConfig] = None,
+                                 chunk_config: Optional[ChunkConfig] = None) -> Dict[str, Dict]:
+    """
+    Builds one collection holding every persona, with a partition per archetype label.
+
+    Unlike the per-archetype collections, rows are stored with typed `archetype`,
+    `confidence` and `genres` fields (with scalar indexes), and by default regardless of
+    their confidence, so confidence thresholds and genre filters are applied at query time
+    (see retrieve_persona_examples) and one build serves all of them. Streaming,
+    checkpointing, chunking and incremental syncs work as in build_all_persona_vector_dbs.
+
+    Returns:
+        Build stats per partition name.
+    """
+    return build_all_persona_vector_dbs(client, embedding_fn, json_path, {label: partition_name(label) for label in labels},
+                                        min_confidence, incremental=incremental, batch_size=batch_size,
+                                        max_in_flight=max_in_flight, checkpoint_path=checkpoint_path,
+                                        index_config=index_config, partitioned_collection=collection_name,
+                                        chunk_config=chunk_config)
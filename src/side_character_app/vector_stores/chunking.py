@@ -0,0 +1,85 @@
+# src/side_character_app/vector_stores/chunking.py
+
+from dataclasses import dataclass
+from typing import Dict, List
+
+# Fields a chunk entity stores besides those of a whole-conversation entity
+CHUNK_FIELDS = ("parent_id", "turn_start", "turn_end", "turn_count", "context_before", "context_after")
+
+@dataclass
+class ChunkConfig:
+    """
+    How conversations are split into turn-window chunks before they are embedded.
+
+    Each chunk holds `window_turns` consecutive turns (lines) of a conversation, and
+    consecutive chunks share `overlap_turns` turns, so an exchange is never cut in two
+    without also appearing whole in a neighbouring chunk. Up to `context_turns` turns on
+    either side of the window are stored with the chunk (but not embedded) and returned
+    with it as surrounding context.
+    """
+    window_turns: int = 4
+    overlap_turns: int = 1
+    context_turns: int = 1
+
+    def __post_init__(self):
+        if self.window_turns < 1:
+            raise ValueError("window_turns must be at least 1.")
+        if not 0 <= self.overlap_turns < self.window_turns:
+            raise ValueError("overlap_turns must be at least 0 and less than window_turns.")
+        if self.context_turns < 0:
+            raise ValueError("context_turns must be at least 0.")
+
+    @property
+    def name(self) -> str:
+        """A short description such as 'window=4,overlap=1,context=1', used to fingerprint builds."""
+        return f"window={self.window_turns},overlap={self.overlap_turns},context={self.context_turns}"
+
+def split_turns(conversation: str) -> List[str]:
+    """Splits a conversation into its turns, one 'NAME: line' per line, dropping blank lines."""
+    return [turn for turn in conversation.split("\n") if turn.strip()]
+
+def chunk_rows(row: Dict, parent_id: int, chunk_config: ChunkConfig) -> List[Dict]:
+    """
+    Splits a labeled conversation row into one row per turn window.
+
+    Every chunk row keeps the fields of `row`, with "conversation" replaced by the window's
+    turns (the text that is embedded), plus "parent_id" (the stable id of the whole
+    conversation), the window's "turn_start"/"turn_end" (end exclusive), the conversation's
+    "turn_count" and the "context_before"/"context_after" turns. A conversation that fits
+    in one window gives a single chunk holding all of it.
+    """
+    turns = split_turns(row["conversation"])
+    window, context = chunk_config.window_turns, chunk_config.context_turns
+    stride = window - chunk_config.overlap_turns
+    starts = list(range(0, max(len(turns) - window, 0) + 1, stride))
+    # Make sure the last turns are covered when the stride does not land on the end
+    if starts[-1] + window < len(turns):
+        starts.append(len(turns) - window)
+    chunks = []
+    for start in starts:
+        end = min(start + window, len(turns))
+        chunks.append({
+            **row,
+            "conversation": "\n".join(turns[start:end]),
+            "parent_id": parent_id,
+            "turn_start": start,
+            "turn_end": end,
+            "turn_count": len(turns),
+            "context_before": "\n".join(turns[max(start - context, 0):start]),
+            "context_after": "\n".join(turns[end:end + context]),
+        })
+    return chunks
+
+def chunk_excerpt(entity: Dict) -> str:
+    """
+    Returns the text of a retrieved chunk entity: its window with the stored context turns
+    around it, and '...' where the conversation continues beyond them.
+    """
+    before, after = entity.get("context_before") or "", entity.get("context_after") or ""
+    lines = []
+    if entity["turn_start"] - len(split_turns(before)) > 0:
+        lines.append("...")
+    lines += [text for text in (before, entity["conversation"], after) if text]
+    if entity["turn_end"] + len(split_turns(after)) < entity["turn_count"]:
+        lines.append("...")
+    return "\n".join(lines)
@@ -0,0 +1,194 @@
+# src/side_character_app/vector_stores/embedding_cache.py
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Rows the vector file grows by at least when it runs out of space
+MIN_GROWTH_ROWS = 1024
+# SQLite limits the number of parameters per statement
+LOOKUP_CHUNK_SIZE = 500
+
+class CachedEmbeddings(Embeddings):
+    """
+    Persistent embedding cache in front of any LangChain embeddings model.
+
+    Vectors are stored as float32 rows of a memory-mapped file; a SQLite (WAL) index maps
+    a hash of (task, text) to its row and tracks when it was last used. Query and document
+    embeddings are cached separately because the model embeds them differently. The cache
+    lives in a per-model directory under `cache_dir`, so the build scripts, the retriever
+    test and the running app all share it, including across processes. The model's
+    dimension is stored too, so it never has to be probed with a test request again.
+    When more than `max_entries` vectors are stored, the least recently used ones are
+    evicted and their rows reused.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache_dir: str, max_entries: int = 1_000_000,
+                 model_name: Optional[str] = None):
+        self.embeddings = embeddings
+        self.model_name = model_name or getattr(embeddings, "model", None) or type(embeddings).__name__
+        self.max_entries = max_entries
+        self.directory = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", self.model_name))
+        os.makedirs(self.directory, exist_ok=True)
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.lock = threading.Lock()
+        self.matrix: Optional[np.memmap] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions (see _store)
+        self.conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), check_same_thread=False,
+                                    timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, slot INTEGER NOT NULL, last_used REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used);
+            CREATE TABLE IF NOT EXISTS free_slots (slot INTEGER PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """)
+
+    @staticmethod
+    def make_key(task: str, text: str) -> str:
+        return hashlib.sha256(f"{task}\0{text}".encode("utf-8")).hexdigest()
+
+    def _meta(self, name: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name: str, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, str(value)))
+
+    @property
+    def dimension(self) -> int:
+        """The model's embedding dimension, probed once and then read from the cache."""
+        with self.lock:
+            dimension = self._meta("dimension")
+        if dimension is None:
+            return len(self.embed_query("test"))
+        return int(dimension)
+
+    def _map(self, rows_needed: int, dimension: int) -> np.memmap:
+        """Returns the vector file mapped with at least `rows_needed` rows, growing it if needed."""
+        row_bytes = dimension * 4
+        size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        if size < rows_needed * row_bytes:
+            capacity = max(rows_needed, 2 * (size // row_bytes), MIN_GROWTH_ROWS)
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(capacity * row_bytes)
+            size = capacity * row_bytes
+        if self.matrix is None or self.matrix.shape[0] * row_bytes != size:
+            # (Re)map after this or another process grew the file
+            self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(size // row_bytes, dimension))
+        return self.matrix
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Returns the cached vectors among `keys` and marks them as recently used."""
+        slots = {}
+        for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            slots.update(self.conn.execute(
+                f"SELECT key, slot FROM embeddings WHERE key IN ({placeholders})", chunk).fetchall())
+        if not slots:
+            return {}
+
+        dimension = int(self._meta("dimension"))
+        matrix = self._map(max(slots.values()) + 1, dimension)
+        found = {key: matrix[slot].tolist() for key, slot in slots.items()}
+        now = time.time()
+        self.conn.execute("BEGIN")
+        self.conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+        self.conn.execute("COMMIT")
+        return found
+
+    def _store(self, vectors: Dict[str, List[float]]):
+        """Writes new vectors, evicting least recently used entries beyond `max_entries`."""
+        dimension = len(next(iter(vectors.values())))
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            stored_dimension = self._meta("dimension")
+            if stored_dimension is None:
+                self._set_meta("dimension", dimension)
+            elif int(stored_dimension) != dimension:
+                raise ValueError(f"Embedding dimension changed from {stored_dimension} to {dimension} "
+                                 f"for model '{self.model_name}'; clear {self.directory}.")
+
+            # Another process may have stored some of these in the meantime
+            new_keys = [key for key in vectors
+                        if self.conn.execute("SELECT 1 FROM embeddings WHERE key = ?", (key,)).fetchone() is None]
+            entries = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if entries + len(new_keys) > self.max_entries:
+                # Evict down to 90% of the limit so eviction runs rarely
+                excess = entries + len(new_keys) - int(self.max_entries * 0.9)
+                evicted = self.conn.execute(
+                    "SELECT key, slot FROM embeddings ORDER BY last_used LIMIT ?", (excess,)).fetchall()
+                self.conn.executemany("DELETE FROM embeddings WHERE key = ?", [(key,) for key, _ in evicted])
+                self.conn.executemany("INSERT OR IGNORE INTO free_slots (slot) VALUES (?)", [(slot,) for _, slot in evicted])
+                self.evictions += len(evicted)
+
+            free = [slot for (slot,) in self.conn.execute("SELECT slot FROM free_slots ORDER BY slot LIMIT ?", (len(new_keys),))]
+            self.conn.executemany("DELETE FROM free_slots WHERE slot = ?", [(slot,) for slot in free])
+            next_slot = int(self._meta("next_slot") or 0)
+            fresh = list(range(next_slot, next_slot + len(new_keys) - len(free)))
+            self._set_meta("next_slot", next_slot + len(fresh))
+            slots = free + fresh
+
+            if new_keys:
+                matrix = self._map(max(slots) + 1, dimension)
+                matrix[slots] = np.asarray([vectors[key] for key in new_keys], dtype=np.float32)
+                matrix.flush()
+            now = time.time()
+            self.conn.executemany("INSERT INTO embeddings (key, slot, last_used) VALUES (?, ?, ?)",
+                                  [(key, slot, now) for key, slot in zip(new_keys, slots)])
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _embed(self, task: str, texts: List[str], compute: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        keys = [self.make_key(task, text) for text in texts]
+        with self.lock:
+            found = self._lookup(list(set(keys)))
+        # Each distinct uncached text is embedded once
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+        with self.lock:
+            self.hits += len(texts) - sum(key in missing for key in keys)
+            self.misses += sum(key in missing for key in keys)
+        if missing:
+            computed = dict(zip(missing, compute(list(missing.values()))))
+            with self.lock:
+                self._store(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed("document", texts, self.embeddings.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed("query", [text], lambda texts: [self.embeddings.embed_query(texts[0])])[0]
+
+    def stats(self) -> dict:
+        """Returns hit/miss/eviction counters for this session and the current entry count."""
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+            self.matrix = None
@@ -0,0 +1,122 @@
+# src/side_character_app/vector_stores/index_config.py
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from pymilvus import DataType, MilvusClient
+
+# IVF_SQ8 stores 8-bit scalar-quantized vectors, IVF_PQ product-quantized codes
+INDEX_TYPES = ("FLAT", "IVF_FLAT", "HNSW", "IVF_SQ8", "IVF_PQ")
+METRIC_TYPES = ("COSINE", "IP", "L2")
+PRECISIONS = ("float32", "float16")
+
+# Build-time and search-time parameters used when none are given for an index type
+DEFAULT_BUILD_PARAMS = {"FLAT": {}, "IVF_FLAT": {"nlist": 128}, "HNSW": {"M": 16, "efConstruction": 200},
+                        "IVF_SQ8": {"nlist": 128}, "IVF_PQ": {"nlist": 128, "nbits": 8}}
+DEFAULT_SEARCH_PARAMS = {"FLAT": {}, "IVF_FLAT": {"nprobe": 16}, "HNSW": {"ef": 64},
+                         "IVF_SQ8": {"nprobe": 16}, "IVF_PQ": {"nprobe": 16}}
+# Without an explicit "m", IVF_PQ splits vectors into sub-vectors of this many dimensions
+PQ_SUBVECTOR_DIMENSIONS = 8
+
+@dataclass
+class IndexConfig:
+    """
+    How a collection's vectors are indexed and searched.
+
+    `build_params` are applied when the index is created (IVF_FLAT: nlist; HNSW: M and
+    efConstruction) and `search_params` with every query (IVF_FLAT: nprobe; HNSW: ef, which
+    must be at least the number of results requested). FLAT is exact search and takes no
+    parameters. Missing parameters are filled in from the defaults for the index type.
+
+    To reduce memory, vectors can be stored at `precision="float16"` and/or truncated to
+    their first `truncate_dim` dimensions (re-normalized; text-embedding-004 vectors keep
+    most of their quality when truncated), and the IVF_SQ8 (int8) and IVF_PQ (product
+    quantization, `m` sub-quantizers of `nbits` bits) index types compress them further.
+    """
+    index_type: str = "FLAT"
+    metric_type: str = "COSINE"
+    build_params: Dict = field(default_factory=dict)
+    search_params: Dict = field(default_factory=dict)
+    precision: str = "float32"
+    truncate_dim: Optional[int] = None
+
+    def __post_init__(self):
+        self.index_type = self.index_type.upper()
+        self.metric_type = self.metric_type.upper()
+        if self.index_type not in INDEX_TYPES:
+            raise ValueError(f"Unsupported index type '{self.index_type}'; expected one of {', '.join(INDEX_TYPES)}.")
+        if self.metric_type not in METRIC_TYPES:
+            raise ValueError(f"Unsupported metric type '{self.metric_type}'; expected one of {', '.join(METRIC_TYPES)}.")
+        if self.precision not in PRECISIONS:
+            raise ValueError(f"Unsupported precision '{self.precision}'; expected one of {', '.join(PRECISIONS)}.")
+        self.build_params = {**DEFAULT_BUILD_PARAMS[self.index_type], **self.build_params}
+        self.search_params = {**DEFAULT_SEARCH_PARAMS[self.index_type], **self.search_params}
+
+    @property
+    def name(self) -> str:
+        """A short description such as 'HNSW/COSINE M=16,efConstruction=200 ef=64'."""
+        def params(values: Dict) -> str:
+            return ",".join(f"{key}={value}" for key, value in values.items())
+        storage = self.precision + (f"[:{self.truncate_dim}]" if self.truncate_dim else "")
+        return " ".join(part for part in [f"{self.index_type}/{self.metric_type}", params(self.build_params),
+                                          params(self.search_params), storage if storage != "float32" else ""] if part)
+
+    @property
+    def vector_datatype(self):
+        """The Milvus type of the vector field."""
+        return DataType.FLOAT16_VECTOR if self.precision == "float16" else DataType.FLOAT_VECTOR
+
+    def stored_dimension(self, dimension: int) -> int:
+        """The dimension vectors of an embedding model with `dimension` are stored at."""
+        return min(self.truncate_dim, dimension) if self.truncate_dim else dimension
+
+    def resolved_build_params(self, dimension: int) -> Dict:
+        """The build parameters for vectors of the embedding `dimension`, choosing IVF_PQ's `m` if not set."""
+        params = dict(self.build_params)
+        if self.index_type == "IVF_PQ":
+            stored = self.stored_dimension(dimension)
+            params.setdefault("m", max(1, stored // PQ_SUBVECTOR_DIMENSIONS))
+            if stored % params["m"]:
+                raise ValueError(f"IVF_PQ needs m ({params['m']}) to divide the vector dimension ({stored}).")
+        return params
+
+    def index_params(self, client: MilvusClient, dimension: Optional[int] = None, field_name: str = "vector"):
+        """Returns the Milvus index parameters for the vector field of an embedding model with `dimension`."""
+        index_params = client.prepare_index_params()
+        params = self.resolved_build_params(dimension) if dimension else dict(self.build_params)
+        index_params.add_index(field_name=field_name, index_type=self.index_type, metric_type=self.metric_type,
+                               params=params)
+        return index_params
+
+    def bytes_per_vector(self, dimension: int) -> float:
+        """
+        Estimates the memory one vector of the embedding `dimension` takes in the loaded index.
+
+        Covers the stored vector or code and HNSW's graph links; per-index overhead such as
+        IVF centroids and PQ codebooks does not grow with the number of vectors and is left out.
+        """
+        stored = self.stored_dimension(dimension)
+        if self.index_type == "IVF_SQ8":
+            return float(stored)
+        if self.index_type == "IVF_PQ":
+            params = self.resolved_build_params(dimension)
+            return params["m"] * params["nbits"] / 8
+        size = stored * (2 if self.precision == "float16" else 4)
+        if self.index_type == "HNSW":
+            # Two neighbor lists of 4-byte ids per vector on the base layer
+            size += 2 * self.build_params["M"] * 4
+        return float(size)
+
+    def milvus_search_params(self, overrides: Optional[Dict] = None) -> Dict:
+        """Returns the `search_params` argument for MilvusClient.search, optionally overriding parameters."""
+        return {"metric_type": self.metric_type, "params": {**self.search_params, **(overrides or {})}}
+
+def collection_schema(dimension: int, vector_datatype=DataType.FLOAT_VECTOR):
+    """
+    The schema Milvus' quick setup creates (an INT64 "id" key, a "vector" field and dynamic
+    fields for everything else), spelled out so it can be combined with custom index
+    parameters and a reduced-precision vector type.
+    """
+    schema = MilvusClient.create_schema(auto_id=False, enable_dynamic_field=True)
+    schema.add_field(field_name="id", datatype=DataType.INT64, is_primary=True)
+    schema.add_field(field_name="vector", datatype=vector_datatype, dim=dimension)
+    return schema
@@ -0,0 +1,55 @@
+# src/side_character_app/vector_stores/layout.py
+
+from typing import List, Optional
+from pymilvus import DataType, MilvusClient
+
+from .index_config import IndexConfig, collection_schema
+
+MAX_GENRES = 32
+MAX_LABEL_LENGTH = 64
+
+def partitioned_collection_schema(dimension: int, vector_datatype=DataType.FLOAT_VECTOR):
+    """
+    The schema of the partitioned collection: the per-archetype schema plus typed scalar
+    fields for the archetype, confidence and genres, so they can be indexed and filtered on.
+    """
+    schema = collection_schema(dimension, vector_datatype)
+    schema.add_field(field_name="archetype", datatype=DataType.VARCHAR, max_length=MAX_LABEL_LENGTH)
+    schema.add_field(field_name="confidence", datatype=DataType.INT64)
+    schema.add_field(field_name="genres", datatype=DataType.ARRAY, element_type=DataType.VARCHAR,
+                     max_capacity=MAX_GENRES, max_length=MAX_LABEL_LENGTH)
+    return schema
+
+def partitioned_index_params(client: MilvusClient, index_config: Optional[IndexConfig] = None,
+                             dimension: Optional[int] = None):
+    """
+    Index parameters for the partitioned collection: the vector index (Milvus' default index
+    when `index_config` is None) plus scalar indexes on confidence and genres.
+    """
+    if index_config is not None:
+        index_params = index_config.index_params(client, dimension)
+    else:
+        index_params = client.prepare_index_params()
+        index_params.add_index(field_name="vector", index_type="AUTOINDEX", metric_type="COSINE")
+    # A sorted index serves range filters such as "confidence >= 8"; an inverted index serves array_contains
+    index_params.add_index(field_name="confidence", index_type="STL_SORT")
+    index_params.add_index(field_name="genres", index_type="INVERTED")
+    return index_params
+
+def init_partitioned_collection(client: MilvusClient, collection_name: str, dimension: int, partitions: List[str],
+                                index_config: Optional[IndexConfig] = None):
+    """Drops and recreates the partitioned collection with the given partitions (one per archetype)."""
+    if client.has_collection(collection_name=collection_name):
+        client.drop_collection(collection_name=collection_name)
+        print(f"Dropped existing collection: '{collection_name}'")
+
+    schema = (partitioned_collection_schema(index_config.stored_dimension(dimension), index_config.vector_datatype)
+              if index_config is not None else partitioned_collection_schema(dimension))
+    client.create_collection(
+        collection_name=collection_name,
+        schema=schema,
+        index_params=partitioned_index_params(client, index_config, dimension)
+    )
+    for name in partitions:
+        client.create_partition(collection_name=collection_name, partition_name=name)
+    print(f"Created new collection: '{collection_name}' with partitions {', '.join(partitions)}")
@@ -0,0 +1,191 @@
+# src/side_character_app/vector_stores/numpy_store.py
+
+import json
+import mmap
+import os
+import shutil
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Rows fetched from Milvus per query_iterator batch during export
+EXPORT_BATCH_SIZE = 1000
+# Rows scored per matrix multiply, bounding the temporary score matrix for large stores
+SEARCH_CHUNK_ROWS = 65536
+
+def _as_float32(vector) -> np.ndarray:
+    # Float16 collections return each vector as raw bytes
+    if isinstance(vector, (bytes, bytearray)):
+        return np.frombuffer(vector, dtype=np.float16).astype(np.float32)
+    if isinstance(vector, list) and vector and isinstance(vector[0], (bytes, bytearray)):
+        return np.frombuffer(b"".join(vector), dtype=np.float16).astype(np.float32)
+    return np.asarray(vector, dtype=np.float32)
+
+def export_collection(client, collection_name: str, output_dir: str) -> int:
+    """
+    Exports a Milvus collection to a NumpyVectorStore directory.
+
+    Writes `<output_dir>/<collection_name>/` with:
+      - vectors.npy: an (n, dimension) float32 matrix of unit-length vectors, so cosine
+        similarity is a plain dot product;
+      - ids.npy: the primary keys, row-aligned with the vectors;
+      - metadata.jsonl: every other stored field of a row as one JSON line, with
+        offsets.npy holding each line's byte offset, so single rows are read on demand.
+    The files are written to a temporary directory first and swapped in at the end, so
+    readers never see a half-written store.
+
+    Returns:
+        The number of exported rows.
+    """
+    target_dir = os.path.join(output_dir, collection_name)
+    temp_dir = target_dir + ".tmp"
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    os.makedirs(temp_dir)
+
+    ids, vectors, offsets = [], [], [0]
+    with open(os.path.join(temp_dir, "metadata.jsonl"), "wb") as metadata_file:
+        iterator = client.query_iterator(collection_name=collection_name, batch_size=EXPORT_BATCH_SIZE,
+                                         filter="id >= 0", output_fields=["*"])
+        while True:
+            batch = iterator.next()
+            if not batch:
+                iterator.close()
+                break
+            for item in batch:
+                ids.append(item["id"])
+                vectors.append(_as_float32(item["vector"]))
+                metadata = {key: value for key, value in item.items() if key not in ("id", "vector")}
+                line = (json.dumps(metadata, ensure_ascii=False) + "\n").encode("utf-8")
+                metadata_file.write(line)
+                offsets.append(offsets[-1] + len(line))
+
+    matrix = np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+    if len(matrix):
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    np.save(os.path.join(temp_dir, "vectors.npy"), matrix.astype(np.float32))
+    np.save(os.path.join(temp_dir, "ids.npy"), np.asarray(ids, dtype=np.int64))
+    np.save(os.path.join(temp_dir, "offsets.npy"), np.asarray(offsets, dtype=np.int64))
+
+    shutil.rmtree(target_dir, ignore_errors=True)
+    os.replace(temp_dir, target_dir)
+    return len(ids)
+
+class _Collection:
+    """The memory-mapped files of one exported collection."""
+
+    def __init__(self, directory: str):
+        self.vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+        self.ids = np.load(os.path.join(directory, "ids.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(directory, "offsets.npy"), mmap_mode="r")
+        self.metadata_file = open(os.path.join(directory, "metadata.jsonl"), "rb")
+        size = os.fstat(self.metadata_file.fileno()).st_size
+        self.metadata = mmap.mmap(self.metadata_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def row_metadata(self, row: int) -> Dict:
+        return json.loads(self.metadata[self.offsets[row]:self.offsets[row + 1]])
+
+    def close(self):
+        if isinstance(self.metadata, mmap.mmap):
+            self.metadata.close()
+        self.metadata_file.close()
+
+class NumpyVectorStore:
+    """
+    A read-only, in-process replacement for the parts of MilvusClient the retriever uses.
+
+    Serves collections exported with export_collection by exact cosine search: queries
+    are scored against the memory-mapped vector matrix with one matrix multiply per chunk
+    of rows, and only the metadata of the top hits is read. Opening the store costs
+    nothing until a collection is first searched; the files are mapped read-only, so any
+    number of processes share one copy of them in the OS page cache. Search results have
+    the same shape as MilvusClient.search results, so retrieve_persona_examples accepts
+    either client.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.collections: Dict[str, _Collection] = {}
+
+    def list_collections(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory)
+                      if os.path.exists(os.path.join(self.directory, name, "vectors.npy")))
+
+    def has_collection(self, collection_name: str) -> bool:
+        return os.path.exists(os.path.join(self.directory, collection_name, "vectors.npy"))
+
+    def _open(self, collection_name: str) -> _Collection:
+        with self.lock:
+            collection = self.collections.get(collection_name)
+            if collection is None:
+                if not self.has_collection(collection_name):
+                    raise ValueError(f"Collection '{collection_name}' not found in {self.directory}.")
+                collection = _Collection(os.path.join(self.directory, collection_name))
+                self.collections[collection_name] = collection
+            return collection
+
+    def describe_collection(self, collection_name: str) -> Dict:
+        """Describes the primary key and vector fields, in the format of MilvusClient.describe_collection."""
+        collection = self._open(collection_name)
+        return {
+            "collection_name": collection_name,
+            "fields": [
+                {"name": "id", "type": "INT64", "params": {}, "is_primary": True},
+                {"name": "vector", "type": "FLOAT_VECTOR", "params": {"dim": int(collection.vectors.shape[1])}},
+            ],
+        }
+
+    def search(self, collection_name: str, data: List, limit: int = 10, output_fields: Optional[List[str]] = None,
+               search_params: Optional[Dict] = None, filter: str = "", partition_names: Optional[List[str]] = None,
+               **kwargs) -> List[List[Dict]]:
+        """
+        Returns the `limit` most similar rows (by cosine similarity) for each query vector in `data`.
+
+        All queries are scored together. `search_params` is accepted for compatibility and
+        ignored, since the search is always exact; filter expressions and partitions are
+        not supported.
+        """
+        if filter or partition_names:
+            raise ValueError("NumpyVectorStore does not support filter expressions or partitions; "
+                             "export the per-archetype collections instead.")
+        collection = self._open(collection_name)
+        queries = np.asarray([_as_float32(vector) for vector in data], dtype=np.float32)
+        queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        total = collection.vectors.shape[0]
+        limit = min(limit, total)
+        if limit == 0:
+            return [[] for _ in data]
+
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, total, SEARCH_CHUNK_ROWS):
+            scores = queries @ collection.vectors[start:start + SEARCH_CHUNK_ROWS].T
+            k = min(limit, scores.shape[1])
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            # Merge this chunk's best rows with the best found so far
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            best_rows = np.concatenate([best_rows, top + start], axis=1)
+            if best_scores.shape[1] > limit:
+                keep = np.argpartition(-best_scores, limit - 1, axis=1)[:, :limit]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        results = []
+        for scores, rows in zip(np.take_along_axis(best_scores, order, axis=1), np.take_along_axis(best_rows, order, axis=1)):
+            hits = []
+            for score, row in zip(scores, rows):
+                metadata = collection.row_metadata(int(row))
+                entity = {key: metadata.get(key) for key in output_fields} if output_fields else {}
+                hits.append({"id": int(collection.ids[row]), "distance": float(score), "entity": entity})
+            results.append(hits)
+        return results
+
+    def close(self):
+        with self.lock:
+            for collection in self.collections.values():
+                collection.close()
+            self.collections = {}
@@ -0,0 +1,33 @@
+# src/side_character_app/vector_stores/partitions.py
+
+import json
+import re
+from typing import List, Optional
+
+# Name of the single collection holding every archetype, one partition each
+PARTITIONED_COLLECTION = "persona_conversations_db"
+
+def partition_name(label: str) -> str:
+    """Maps an archetype label to a valid partition name, e.g. 'Wise Mentor' -> 'wise_mentor'."""
+    return re.sub(r"[^a-z0-9]+", "_", label.lower()).strip("_")
+
+def persona_filter(min_confidence: Optional[int] = None, genre: Optional[str] = None, expr: str = "") -> str:
+    """
+    Builds a Milvus filter expression over the partitioned collection's scalar fields.
+
+    Args:
+        min_confidence: Keep only conversations whose confidence is at least this.
+        genre: Keep only conversations from movies with this genre.
+        expr: An additional raw filter expression, combined with AND.
+
+    Returns:
+        The expression, or "" when no condition is given.
+    """
+    conditions: List[str] = []
+    if min_confidence is not None:
+        conditions.append(f"confidence >= {int(min_confidence)}")
+    if genre:
+        conditions.append(f"array_contains(genres, {json.dumps(genre)})")
+    if expr:
+        conditions.append(f"({expr})")
+    return " && ".join(conditions)
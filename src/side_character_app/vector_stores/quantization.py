@@ -0,0 +1,58 @@
+# src/side_character_app/vector_stores/quantization.py
+
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+def vector_format(client, collection_name: str) -> Tuple[int, bool]:
+    """
+    Reads how a collection stores its vectors (from a MilvusClient or a NumpyVectorStore).
+
+    Returns:
+        A tuple of (stored dimension, True if the vector field is FLOAT16_VECTOR).
+    """
+    description = client.describe_collection(collection_name=collection_name)
+    for field_info in description["fields"]:
+        if field_info["name"] == "vector":
+            # Compared by name, so this module does not need pymilvus
+            datatype = getattr(field_info["type"], "name", field_info["type"])
+            return int(field_info["params"]["dim"]), datatype == "FLOAT16_VECTOR"
+    raise ValueError(f"Collection '{collection_name}' has no 'vector' field.")
+
+def fit_vector(vector: Sequence[float], dimension: int, float16: bool = False) -> Union[List[float], np.ndarray]:
+    """
+    Converts a full-precision embedding to the format a collection stores.
+
+    A longer vector is truncated to its first `dimension` values and re-normalized to unit
+    length. Float16 collections need a NumPy float16 array; otherwise unchanged vectors are
+    passed through as they are.
+    """
+    if len(vector) == dimension and not float16:
+        return vector
+    fitted = np.asarray(vector, dtype=np.float32)
+    if len(fitted) > dimension:
+        fitted = fitted[:dimension]
+        fitted = fitted / max(float(np.linalg.norm(fitted)), 1e-12)
+    return fitted.astype(np.float16) if float16 else fitted.tolist()
+
+def rerank_exact(query_vector: Sequence[float], hits: List[Dict], candidate_vectors: Sequence[Sequence[float]],
+                 limit: int) -> List[Dict]:
+    """
+    Re-orders search hits by exact cosine similarity between full-precision vectors.
+
+    Args:
+        query_vector: The full-precision query embedding.
+        hits: Search results of a compressed index, best first.
+        candidate_vectors: The full-precision embedding of each hit, in the same order.
+        limit: Number of hits to keep.
+
+    Returns:
+        The best `limit` hits, with "distance" replaced by the exact cosine similarity.
+    """
+    if not hits:
+        return []
+    query = np.asarray(query_vector, dtype=np.float32)
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    scores = candidates @ query / np.maximum(np.linalg.norm(candidates, axis=1) * np.linalg.norm(query), 1e-12)
+    order = np.argsort(-scores, kind="stable")[:limit]
+    return [{**hits[i], "distance": float(scores[i])} for i in order]
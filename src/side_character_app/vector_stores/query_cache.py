@@ -0,0 +1,96 @@
+# src/side_character_app/vector_stores/query_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, List, Tuple
+
+class QueryEmbeddingCache:
+    """
+    In-memory LRU cache of query embeddings with a time-to-live, shared by all threads.
+
+    It sits in front of the embedding model (and any persistent CachedEmbeddings), so a
+    repeated query costs a dictionary lookup instead of a network round trip or a disk
+    read. Entries older than `ttl_seconds` are recomputed, and beyond `max_entries` the
+    least recently used ones are dropped. Concurrent lookups of a key that is being
+    computed wait for that one computation instead of starting their own. Failures are
+    passed to every waiting caller and are not cached.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[Hashable, Tuple[List[float], float]]" = OrderedDict()
+        self.in_flight: Dict[Hashable, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, compute: Callable[[], List[float]]) -> List[float]:
+        """
+        Returns the cached vector for `key`, calling `compute()` on a miss.
+
+        The returned list is shared with the cache and other callers; do not modify it.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[1] > self.clock():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self.entries[key]
+                self.expirations += 1
+            future = self.in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.in_flight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+
+        try:
+            vector = compute()
+        except BaseException as e:
+            with self.lock:
+                del self.in_flight[key]
+            future.set_exception(e)
+            raise
+        with self.lock:
+            self.entries[key] = (vector, self.clock() + self.ttl_seconds)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            del self.in_flight[key]
+        future.set_result(vector)
+        return vector
+
+    def clear(self):
+        """Drops every cached vector (in-flight computations still complete)."""
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        """Returns hit/miss/coalesced/eviction counters and the current entry count."""
+        with self.lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                # A coalesced lookup also saved an embedding request
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+            }